@@ -199,23 +199,15 @@ def _render_drawdown(df_equity: pd.DataFrame, perfil: str):
             col_benchmark = col
             break
 
-    # Calcular drawdown manualmente
-    equity = df_equity[col_portafolio]
-    rolling_max = equity.cummax()
-    drawdown_portfolio = (equity - rolling_max) / rolling_max
-
-    # Preparar datos para el gráfico
+    # Calcular drawdown (en %) vectorizado sobre los arrays
     df_dd = pd.DataFrame({
         'fecha': df_equity.index,
-        'drawdown_portfolio': drawdown_portfolio * 100,  # Convertir a porcentaje
+        'drawdown_portfolio': ChartFactory.compute_drawdown(df_equity[col_portafolio]),
     })
 
     # Agregar benchmark si existe
     if col_benchmark and col_benchmark in df_equity.columns:
-        equity_bench = df_equity[col_benchmark]
-        rolling_max_bench = equity_bench.cummax()
-        drawdown_benchmark = (equity_bench - rolling_max_bench) / rolling_max_bench
-        df_dd['drawdown_benchmark'] = drawdown_benchmark * 100
+        df_dd['drawdown_benchmark'] = ChartFactory.compute_drawdown(df_equity[col_benchmark])
 
     fig = ChartFactory.create_drawdown_chart(
         df=df_dd,
@@ -486,7 +486,7 @@ def render_all_profiles_comparison(
     
     for col in df_display.columns:
         if col in cols_pct:
-            df_display[col] = df_display[col].apply(Formatters.format_percentage)
+            df_display[col] = Formatters.format_percentage_series(df_display[col])
         elif col in cols_ratio:
             df_display[col] = df_display[col].apply(Formatters.format_sharpe)
     
@@ -11,7 +11,8 @@ import streamlit as st
 import pandas as pd
 import io
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from functools import partial
+from typing import Optional, Dict, Any, List, Callable
 
 try:
     from fpdf import FPDF
@@ -29,10 +30,11 @@ except ImportError:
 class PDFReport(FPDF if HAS_FPDF else object):
     """Clase para generar reportes PDF personalizados."""
     
-    def __init__(self):
+    def __init__(self, generado: Optional[datetime] = None):
         if not HAS_FPDF:
             raise ImportError("fpdf2 no está instalado. Ejecuta: pip install fpdf2")
         super().__init__()
+        self.generado = generado or datetime.now()
         self.set_auto_page_break(auto=True, margin=15)
     
     def header(self):
@@ -40,7 +42,7 @@ class PDFReport(FPDF if HAS_FPDF else object):
         self.set_font('Arial', 'B', 16)
         self.cell(0, 10, 'Portfolio Selector - Reporte', border=0, ln=True, align='C')
         self.set_font('Arial', 'I', 10)
-        self.cell(0, 5, f'Generado: {datetime.now().strftime("%Y-%m-%d %H:%M")}', ln=True, align='C')
+        self.cell(0, 5, f'Generado: {self.generado.strftime("%Y-%m-%d %H:%M")}', ln=True, align='C')
         self.ln(10)
     
     def footer(self):
@@ -109,180 +111,144 @@ class ExportManager:
     """Clase para gestionar exportaciones de datos."""
     
     @staticmethod
-    def generate_pdf_report(
+    def _build_pdf_report(
         perfil: str,
         monto_inversion: float,
         df_portafolio: pd.DataFrame,
         metricas: Dict[str, Any],
-        df_metricas_activos: Optional[pd.DataFrame] = None
-    ) -> Optional[bytes]:
-        """
-        Genera un reporte PDF completo.
+        df_metricas_activos: Optional[pd.DataFrame] = None,
+        generado: Optional[datetime] = None
+    ) -> bytes:
+        """Construye el PDF; propaga las excepciones al llamador (ver _al_descargar)."""
+        generado = generado or datetime.now()
+        pdf = PDFReport(generado)
+        pdf.add_page()
         
-        Args:
-            perfil: Nombre del perfil
-            monto_inversion: Monto invertido
-            df_portafolio: DataFrame con composición
-            metricas: Diccionario con métricas de backtest
-            df_metricas_activos: DataFrame con métricas por activo
-            
-        Returns:
-            bytes del PDF o None si hay error
-        """
-        if not HAS_FPDF:
-            st.error("La librería fpdf2 no está instalada. Ejecuta: pip install fpdf2")
-            return None
+        # Información del perfil
+        pdf.add_section_title(f'Perfil: {perfil.title()}')
+        pdf.add_metric('Monto de Inversión', f'${monto_inversion:,.2f} USD')
+        pdf.add_metric('Fecha de Generación', generado.strftime('%Y-%m-%d %H:%M'))
+        pdf.add_metric('Número de Activos', str(len(df_portafolio)))
+        pdf.ln(5)
         
-        try:
-            pdf = PDFReport()
+        # Métricas de rendimiento
+        pdf.add_section_title('Métricas de Rendimiento')
+        
+        if metricas:
+            pdf.add_metric('Retorno Total', f"{metricas.get('retorno_total', 0)*100:.2f}%")
+            pdf.add_metric('CAGR', f"{metricas.get('cagr', 0)*100:.2f}%")
+            pdf.add_metric('Volatilidad', f"{metricas.get('volatilidad', 0)*100:.2f}%")
+            pdf.add_metric('Sharpe Ratio', f"{metricas.get('sharpe', 0):.2f}")
+            pdf.add_metric('Max Drawdown', f"{metricas.get('max_drawdown', 0)*100:.2f}%")
+            pdf.add_metric('Sortino Ratio', f"{metricas.get('sortino', 0):.2f}")
+        else:
+            pdf.add_text('Métricas no disponibles')
+        
+        pdf.ln(5)
+        
+        # Composición del portafolio
+        pdf.add_section_title('Composición del Portafolio')
+        
+        df_tabla = df_portafolio.copy()
+        df_tabla['monto'] = df_tabla['peso'] * monto_inversion
+        df_tabla = df_tabla[['ticker', 'segmento', 'peso', 'monto']]
+        df_tabla.columns = ['Ticker', 'Seg.', 'Peso', 'Monto']
+        df_tabla['Peso'] = df_tabla['Peso'].apply(lambda x: f'{x*100:.1f}%')
+        df_tabla['Monto'] = df_tabla['Monto'].apply(lambda x: f'${x:,.0f}')
+        
+        pdf.add_table(df_tabla, col_widths=[40, 25, 40, 60])
+        
+        # Métricas por activo (si están disponibles)
+        if df_metricas_activos is not None and not df_metricas_activos.empty:
             pdf.add_page()
+            pdf.add_section_title('Métricas por Activo')
             
-            # Información del perfil
-            pdf.add_section_title(f'Perfil: {perfil.title()}')
-            pdf.add_metric('Monto de Inversión', f'${monto_inversion:,.2f} USD')
-            pdf.add_metric('Fecha de Generación', datetime.now().strftime('%Y-%m-%d %H:%M'))
-            pdf.add_metric('Número de Activos', str(len(df_portafolio)))
-            pdf.ln(5)
-            
-            # Métricas de rendimiento
-            pdf.add_section_title('Métricas de Rendimiento')
-            
-            if metricas:
-                pdf.add_metric('Retorno Total', f"{metricas.get('retorno_total', 0)*100:.2f}%")
-                pdf.add_metric('CAGR', f"{metricas.get('cagr', 0)*100:.2f}%")
-                pdf.add_metric('Volatilidad', f"{metricas.get('volatilidad', 0)*100:.2f}%")
-                pdf.add_metric('Sharpe Ratio', f"{metricas.get('sharpe', 0):.2f}")
-                pdf.add_metric('Max Drawdown', f"{metricas.get('max_drawdown', 0)*100:.2f}%")
-                pdf.add_metric('Sortino Ratio', f"{metricas.get('sortino', 0):.2f}")
-            else:
-                pdf.add_text('Métricas no disponibles')
-            
-            pdf.ln(5)
-            
-            # Composición del portafolio
-            pdf.add_section_title('Composición del Portafolio')
-            
-            df_tabla = df_portafolio.copy()
-            df_tabla['monto'] = df_tabla['peso'] * monto_inversion
-            df_tabla = df_tabla[['ticker', 'segmento', 'peso', 'monto']]
-            df_tabla.columns = ['Ticker', 'Seg.', 'Peso', 'Monto']
-            df_tabla['Peso'] = df_tabla['Peso'].apply(lambda x: f'{x*100:.1f}%')
-            df_tabla['Monto'] = df_tabla['Monto'].apply(lambda x: f'${x:,.0f}')
+            df_activos = df_metricas_activos[['ticker', 'retorno_total', 'volatilidad', 'sharpe']].copy()
+            df_activos.columns = ['Ticker', 'Retorno', 'Vol.', 'Sharpe']
+            df_activos['Retorno'] = df_activos['Retorno'].apply(lambda x: f'{x*100:.1f}%')
+            df_activos['Vol.'] = df_activos['Vol.'].apply(lambda x: f'{x*100:.1f}%')
+            df_activos['Sharpe'] = df_activos['Sharpe'].apply(lambda x: f'{x:.2f}')
             
-            pdf.add_table(df_tabla, col_widths=[40, 25, 40, 60])
-            
-            # Métricas por activo (si están disponibles)
-            if df_metricas_activos is not None and not df_metricas_activos.empty:
-                pdf.add_page()
-                pdf.add_section_title('Métricas por Activo')
-                
-                df_activos = df_metricas_activos[['ticker', 'retorno_total', 'volatilidad', 'sharpe']].copy()
-                df_activos.columns = ['Ticker', 'Retorno', 'Vol.', 'Sharpe']
-                df_activos['Retorno'] = df_activos['Retorno'].apply(lambda x: f'{x*100:.1f}%')
-                df_activos['Vol.'] = df_activos['Vol.'].apply(lambda x: f'{x*100:.1f}%')
-                df_activos['Sharpe'] = df_activos['Sharpe'].apply(lambda x: f'{x:.2f}')
-                
-                pdf.add_table(df_activos, col_widths=[40, 50, 50, 50])
-            
-            # Disclaimer
-            pdf.ln(10)
-            pdf.set_font('Arial', 'I', 8)
-            pdf.multi_cell(0, 4, 
-                'Disclaimer: Este reporte es unicamente informativo. '
-                'Los rendimientos pasados no garantizan rendimientos futuros. '
-                'Consulte con un asesor financiero antes de tomar decisiones de inversion.'
-            )
-            
-            # fpdf2: output() ya devuelve bytes directamente
-            return bytes(pdf.output())
-            
-        except Exception as e:
-            st.error(f"Error generando PDF: {str(e)}")
-            return None
+            pdf.add_table(df_activos, col_widths=[40, 50, 50, 50])
+        
+        # Disclaimer
+        pdf.ln(10)
+        pdf.set_font('Arial', 'I', 8)
+        pdf.multi_cell(0, 4, 
+            'Disclaimer: Este reporte es unicamente informativo. '
+            'Los rendimientos pasados no garantizan rendimientos futuros. '
+            'Consulte con un asesor financiero antes de tomar decisiones de inversion.'
+        )
+        
+        # fpdf2 >= 2.5 devuelve un bytearray; st.download_button (en especial
+        # con datos diferidos) solo acepta str, bytes o archivos, así que se
+        # convierte a bytes
+        return bytes(pdf.output())
     
     @staticmethod
-    def generate_excel_report(
+    def _build_excel_report(
         perfil: str,
         monto_inversion: float,
         df_portafolio: pd.DataFrame,
         metricas: Dict[str, Any],
         df_metricas_activos: Optional[pd.DataFrame] = None,
-        df_equity: Optional[pd.DataFrame] = None
-    ) -> Optional[bytes]:
-        """
-        Genera un reporte Excel con múltiples hojas.
+        df_equity: Optional[pd.DataFrame] = None,
+        generado: Optional[datetime] = None
+    ) -> bytes:
+        """Construye el Excel; propaga las excepciones al llamador (ver _al_descargar)."""
+        generado = generado or datetime.now()
+        output = io.BytesIO()
         
-        Args:
-            perfil: Nombre del perfil
-            monto_inversion: Monto invertido
-            df_portafolio: DataFrame con composición
-            metricas: Diccionario con métricas
-            df_metricas_activos: DataFrame con métricas por activo
-            df_equity: DataFrame con equity curve
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            # Hoja 1: Resumen (filas estáticas escritas directo en openpyxl,
+            # sin pasar por un DataFrame)
+            if metricas:
+                valores_metricas = (
+                    f"{metricas.get('retorno_total', 0)*100:.2f}%",
+                    f"{metricas.get('cagr', 0)*100:.2f}%",
+                    f"{metricas.get('volatilidad', 0)*100:.2f}%",
+                    f"{metricas.get('sharpe', 0):.2f}",
+                    f"{metricas.get('max_drawdown', 0)*100:.2f}%",
+                    f"{metricas.get('sortino', 0):.2f}",
+                )
+            else:
+                valores_metricas = ('N/A',) * 6
             
-        Returns:
-            bytes del Excel o None si hay error
-        """
-        if not HAS_OPENPYXL:
-            st.error("La librería openpyxl no está instalada. Ejecuta: pip install openpyxl")
-            return None
-        
-        try:
-            output = io.BytesIO()
+            ws_resumen = writer.book.create_sheet('Resumen')
+            for fila in (
+                ('Parámetro', 'Valor'),
+                ('Perfil', perfil.title()),
+                ('Monto de Inversión', f'${monto_inversion:,.2f}'),
+                ('Número de Activos', len(df_portafolio)),
+                ('Fecha de Generación', generado.strftime('%Y-%m-%d %H:%M')),
+                ('', ''),
+                *zip(
+                    ('Retorno Total', 'CAGR', 'Volatilidad',
+                     'Sharpe Ratio', 'Max Drawdown', 'Sortino Ratio'),
+                    valores_metricas
+                ),
+            ):
+                ws_resumen.append(fila)
             
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Hoja 1: Resumen
-                df_resumen = pd.DataFrame({
-                    'Parámetro': [
-                        'Perfil',
-                        'Monto de Inversión',
-                        'Número de Activos',
-                        'Fecha de Generación',
-                        '',
-                        'Retorno Total',
-                        'CAGR',
-                        'Volatilidad',
-                        'Sharpe Ratio',
-                        'Max Drawdown',
-                        'Sortino Ratio',
-                    ],
-                    'Valor': [
-                        perfil.title(),
-                        f'${monto_inversion:,.2f}',
-                        len(df_portafolio),
-                        datetime.now().strftime('%Y-%m-%d %H:%M'),
-                        '',
-                        f"{metricas.get('retorno_total', 0)*100:.2f}%" if metricas else 'N/A',
-                        f"{metricas.get('cagr', 0)*100:.2f}%" if metricas else 'N/A',
-                        f"{metricas.get('volatilidad', 0)*100:.2f}%" if metricas else 'N/A',
-                        f"{metricas.get('sharpe', 0):.2f}" if metricas else 'N/A',
-                        f"{metricas.get('max_drawdown', 0)*100:.2f}%" if metricas else 'N/A',
-                        f"{metricas.get('sortino', 0):.2f}" if metricas else 'N/A',
-                    ]
-                })
-                df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
-                
-                # Hoja 2: Composición del portafolio
-                df_comp = df_portafolio.copy()
-                df_comp['monto_usd'] = df_comp['peso'] * monto_inversion
-                df_comp['peso_pct'] = df_comp['peso'] * 100
-                df_comp = df_comp[['ticker', 'segmento', 'peso_pct', 'monto_usd']]
-                df_comp.columns = ['Ticker', 'Segmento', 'Peso (%)', 'Monto (USD)']
-                df_comp.to_excel(writer, sheet_name='Composicion', index=False)
-                
-                # Hoja 3: Métricas por activo
-                if df_metricas_activos is not None and not df_metricas_activos.empty:
-                    df_metricas_activos.to_excel(writer, sheet_name='Metricas_Activos', index=False)
-                
-                # Hoja 4: Equity curve
-                if df_equity is not None and not df_equity.empty:
-                    df_equity.to_excel(writer, sheet_name='Equity_Curve', index=True)
+            # Hoja 2: Composición del portafolio
+            peso = df_portafolio['peso'].to_numpy()
+            df_comp = pd.DataFrame({
+                'Ticker': df_portafolio['ticker'].to_numpy(),
+                'Segmento': df_portafolio['segmento'].to_numpy(),
+                'Peso (%)': peso * 100,
+                'Monto (USD)': peso * monto_inversion,
+            })
+            df_comp.to_excel(writer, sheet_name='Composicion', index=False)
             
-            return output.getvalue()
+            # Hoja 3: Métricas por activo
+            if df_metricas_activos is not None and not df_metricas_activos.empty:
+                df_metricas_activos.to_excel(writer, sheet_name='Metricas_Activos', index=False)
             
-        except Exception as e:
-            st.error(f"Error generando Excel: {str(e)}")
-            return None
+            # Hoja 4: Equity curve
+            if df_equity is not None and not df_equity.empty:
+                df_equity.to_excel(writer, sheet_name='Equity_Curve', index=True)
+        
+        return output.getvalue()
     
     @staticmethod
     def generate_csv_portfolio(df_portafolio: pd.DataFrame, monto_inversion: float) -> bytes:
@@ -296,11 +262,52 @@ class ExportManager:
         Returns:
             bytes del CSV
         """
-        df = df_portafolio.copy()
-        df['monto_usd'] = df['peso'] * monto_inversion
-        df['peso_pct'] = df['peso'] * 100
+        # assign agrega las columnas calculadas en un solo paso y conserva
+        # el dtype de cada columna (category, string[pyarrow], ...)
+        peso = df_portafolio['peso']
+        df = df_portafolio.assign(monto_usd=peso * monto_inversion, peso_pct=peso * 100)
         
-        return df.to_csv(index=False).encode('utf-8')
+        # El writer de pandas codifica directo al buffer binario, sin crear
+        # primero el CSV completo como str para luego re-codificarlo
+        buffer = io.BytesIO()
+        df.to_csv(buffer, index=False, encoding='utf-8')
+        return buffer.getvalue()
+
+
+# Los archivos se generan de forma diferida: st.download_button recibe un
+# callable y solo lo ejecuta cuando el usuario hace clic, así que los re-runs
+# de Streamlit no reconstruyen (ni hashean) CSV, Excel y PDF.
+
+def _al_descargar(
+    builder: Callable,
+    formato: str,
+    errores: Dict[str, str],
+    *args
+) -> Callable[[], bytes]:
+    """
+    Callable sin argumentos que construye el archivo al hacer clic.
+    
+    La fecha de generación se toma en ese momento y se pasa al builder,
+    de modo que el reporte siempre muestra la hora real de la descarga.
+    
+    El callable corre en otro hilo, donde Streamlit ignora st.error: si el
+    builder falla, el mensaje se guarda en ``errores`` (un dict de
+    st.session_state) para mostrarlo en el siguiente re-run y la excepción
+    se propaga para que la descarga no entregue un archivo incompleto.
+    
+    Args:
+        builder: ExportManager._build_* a ejecutar
+        formato: Nombre del formato para el mensaje ('Excel', 'PDF')
+        errores: Dict de errores pendientes de la sesión
+        *args: Argumentos posicionales del builder
+    """
+    def construir() -> bytes:
+        try:
+            return builder(*args, generado=datetime.now())
+        except Exception as e:
+            errores[formato] = f"Error generando {formato}: {str(e)}"
+            raise
+    return construir
 
 
 def render_export_buttons(
@@ -328,12 +335,17 @@ def render_export_buttons(
     
     fecha = datetime.now().strftime('%Y%m%d')
     
+    # Errores de descargas anteriores (ver _al_descargar)
+    errores = st.session_state.setdefault('export_errores', {})
+    for mensaje in list(errores.values()):
+        st.error(mensaje)
+    errores.clear()
+    
     with col1:
         # Botón CSV
-        csv_data = ExportManager.generate_csv_portfolio(df_portafolio, monto_inversion)
         st.download_button(
             label="Descargar CSV",
-            data=csv_data,
+            data=partial(ExportManager.generate_csv_portfolio, df_portafolio, monto_inversion),
             file_name=f"portafolio_{perfil}_{fecha}.csv",
             mime="text/csv",
             help="Descarga la composición del portafolio en formato CSV"
@@ -342,18 +354,17 @@ def render_export_buttons(
     with col2:
         # Botón Excel
         if HAS_OPENPYXL:
-            excel_data = ExportManager.generate_excel_report(
-                perfil, monto_inversion, df_portafolio, 
-                metricas, df_metricas_activos, df_equity
+            st.download_button(
+                label="Descargar Excel",
+                data=_al_descargar(
+                    ExportManager._build_excel_report, 'Excel', errores,
+                    perfil, monto_inversion, df_portafolio,
+                    metricas, df_metricas_activos, df_equity
+                ),
+                file_name=f"reporte_{perfil}_{fecha}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                help="Descarga el reporte completo en formato Excel"
             )
-            if excel_data:
-                st.download_button(
-                    label="Descargar Excel",
-                    data=excel_data,
-                    file_name=f"reporte_{perfil}_{fecha}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    help="Descarga el reporte completo en formato Excel"
-                )
         else:
             st.button("Excel (no disponible)", disabled=True)
             st.caption("Instalar: pip install openpyxl")
@@ -361,18 +372,17 @@ def render_export_buttons(
     with col3:
         # Botón PDF
         if HAS_FPDF:
-            pdf_data = ExportManager.generate_pdf_report(
-                perfil, monto_inversion, df_portafolio,
-                metricas, df_metricas_activos
+            st.download_button(
+                label="Descargar PDF",
+                data=_al_descargar(
+                    ExportManager._build_pdf_report, 'PDF', errores,
+                    perfil, monto_inversion, df_portafolio,
+                    metricas, df_metricas_activos
+                ),
+                file_name=f"reporte_{perfil}_{fecha}.pdf",
+                mime="application/pdf",
+                help="Descarga el reporte en formato PDF"
             )
-            if pdf_data:
-                st.download_button(
-                    label="Descargar PDF",
-                    data=pdf_data,
-                    file_name=f"reporte_{perfil}_{fecha}.pdf",
-                    mime="application/pdf",
-                    help="Descarga el reporte en formato PDF"
-                )
         else:
             st.button("PDF (no disponible)", disabled=True)
             st.caption("Instalar: pip install fpdf2")
@@ -387,12 +397,11 @@ def render_quick_export(df_portafolio: pd.DataFrame, monto_inversion: float, per
         monto_inversion: Monto invertido
         perfil: Nombre del perfil
     """
-    csv_data = ExportManager.generate_csv_portfolio(df_portafolio, monto_inversion)
     fecha = datetime.now().strftime('%Y%m%d')
     
     st.download_button(
         label="Exportar",
-        data=csv_data,
+        data=partial(ExportManager.generate_csv_portfolio, df_portafolio, monto_inversion),
         file_name=f"portafolio_{perfil}_{fecha}.csv",
         mime="text/csv",
         use_container_width=True
@@ -18,10 +18,95 @@ from utils.formatters import Formatters, ColorPalette
 from utils.charts import ChartFactory
 
 
+# Layouts de los gráficos del detalle de activo (constantes de módulo para no
+# reconstruir los dicts en cada rerun de Streamlit)
+_DRAWDOWN_LAYOUT = dict(
+    xaxis_title="Fecha",
+    yaxis_title="Drawdown (%)",
+    height=300,
+    margin=dict(l=20, r=20, t=20, b=20),
+    template='plotly_white'
+)
+
+_HEATMAP_LAYOUT = dict(
+    xaxis_title='Mes',
+    yaxis_title='Año',
+    height=300,
+    margin=dict(l=50, r=20, t=30, b=50)
+)
+
+_HISTOGRAM_LAYOUT = dict(
+    showlegend=False,
+    height=300,
+    margin=dict(l=20, r=20, t=20, b=20)
+)
+
+_ANNUAL_LAYOUT = dict(
+    xaxis_title='Año',
+    yaxis_title='Retorno (%)',
+    height=300,
+    margin=dict(l=50, r=20, t=30, b=50)
+)
+
+
+def _calcular_betas(
+    df_precios: pd.DataFrame,
+    tickers: List[str],
+    benchmark: str = 'SPY'
+) -> dict:
+    """
+    Calcula la beta de varios activos contra el benchmark en una sola pasada.
+    
+    Los retornos del benchmark se calculan una vez y se alinean con la matriz
+    de retornos de todos los activos mediante una máscara de valores válidos,
+    en lugar de intersectar índices activo por activo.
+    
+    La muestra es la misma que en _calcular_metricas_activo: el retorno de
+    cada activo es el de ``precios.dropna().pct_change()`` (entre días con
+    precio, saltando huecos) y el del benchmark el de ``pct_change()`` con
+    relleno hacia adelante.
+    
+    Args:
+        df_precios: DataFrame con precios
+        tickers: Tickers de los activos
+        benchmark: Ticker del benchmark
+        
+    Returns:
+        dict ticker -> beta (0 si no hay datos suficientes)
+    """
+    tickers = [t for t in tickers if t in df_precios.columns]
+    if not tickers or benchmark not in df_precios.columns:
+        return {t: 0 for t in tickers}
+    
+    # Precio anterior válido de cada activo (ffill + shift): equivale a
+    # dropna().pct_change() por columna, con NaN en los días sin precio
+    precios = df_precios[tickers]
+    R = (precios / precios.ffill().shift(1) - 1).to_numpy()
+    b = df_precios[benchmark].ffill().pct_change(fill_method=None).to_numpy()[:, None]
+    
+    valido = ~np.isnan(R) & ~np.isnan(b)
+    n = valido.sum(axis=0)
+    n_seguro = np.maximum(n, 2)
+    
+    R = np.where(valido, R, 0.0)
+    B = np.where(valido, b, 0.0)
+    dR = np.where(valido, R - R.sum(axis=0) / n_seguro, 0.0)
+    dB = np.where(valido, B - B.sum(axis=0) / n_seguro, 0.0)
+    
+    # Mismo criterio que np.cov (ddof=1) sobre np.var (ddof=0)
+    cov = (dR * dB).sum(axis=0) / (n_seguro - 1)
+    var_b = (dB ** 2).sum(axis=0) / n_seguro
+    
+    ok = (n > 20) & (var_b > 0)
+    betas = np.where(ok, cov / np.where(ok, var_b, 1.0), 0.0)
+    return dict(zip(tickers, betas.tolist()))
+
+
 def _calcular_metricas_activo(
     df_precios: pd.DataFrame,
     ticker: str,
-    benchmark: str = 'SPY'
+    benchmark: str = 'SPY',
+    beta: Optional[float] = None
 ) -> dict:
     """
     Calcula métricas para un activo individual.
@@ -30,6 +115,7 @@ def _calcular_metricas_activo(
         df_precios: DataFrame con precios
         ticker: Ticker del activo
         benchmark: Ticker del benchmark
+        beta: Beta precalculada con _calcular_betas (se calcula si es None)
         
     Returns:
         dict con métricas calculadas
@@ -64,17 +150,8 @@ def _calcular_metricas_activo(
     sortino = cagr / downside_vol if downside_vol > 0 else 0
     
     # Beta vs benchmark
-    beta = 0
-    if benchmark in df_precios.columns:
-        ret_benchmark = df_precios[benchmark].pct_change().dropna()
-        # Alinear índices
-        common_idx = retornos.index.intersection(ret_benchmark.index)
-        if len(common_idx) > 20:
-            ret_a = retornos.loc[common_idx]
-            ret_b = ret_benchmark.loc[common_idx]
-            cov = np.cov(ret_a, ret_b)[0, 1]
-            var_b = np.var(ret_b)
-            beta = cov / var_b if var_b > 0 else 0
+    if beta is None:
+        beta = _calcular_betas(df_precios, [ticker], benchmark).get(ticker, 0)
     
     # Retornos mensuales
     ret_mensual = retornos.resample('M').apply(lambda x: (1 + x).prod() - 1)
@@ -98,21 +175,22 @@ def _render_tabla_metricas_activos(df_metricas: pd.DataFrame):
     """Renderiza la tabla de métricas por activo."""
     st.subheader("Metricas por Activo")
     
+    # Ordenar por Sharpe descendente sobre los valores numéricos, antes de
+    # convertir a texto
+    df_metricas = df_metricas.sort_values('sharpe', ascending=False)
+    
     # Formatear para display
     df_display = pd.DataFrame({
         'Ticker': df_metricas['ticker'],
-        'Retorno Total': df_metricas['retorno_total'].apply(Formatters.format_percentage),
-        'CAGR': df_metricas['cagr'].apply(Formatters.format_percentage),
-        'Volatilidad': df_metricas['volatilidad'].apply(Formatters.format_percentage),
+        'Retorno Total': Formatters.format_percentage_series(df_metricas['retorno_total']),
+        'CAGR': Formatters.format_percentage_series(df_metricas['cagr']),
+        'Volatilidad': Formatters.format_percentage_series(df_metricas['volatilidad']),
         'Sharpe': df_metricas['sharpe'].apply(Formatters.format_sharpe),
-        'Max DD': df_metricas['max_drawdown'].apply(Formatters.format_percentage),
+        'Max DD': Formatters.format_percentage_series(df_metricas['max_drawdown']),
         'Beta': df_metricas['beta'].apply(Formatters.format_beta),
-        'Win Rate': df_metricas['win_rate'].apply(Formatters.format_percentage),
+        'Win Rate': Formatters.format_percentage_series(df_metricas['win_rate']),
     })
     
-    # Ordenar por Sharpe descendente
-    df_display = df_display.sort_values('Sharpe', ascending=False, key=lambda x: df_metricas['sharpe'])
-    
     st.dataframe(
         df_display,
         use_container_width=True,
@@ -139,6 +217,31 @@ def _render_selector_activo(tickers: List[str]) -> str:
     )
 
 
+_METRICAS_PCT = ('retorno_total', 'cagr', 'volatilidad', 'max_drawdown', 'win_rate')
+_METRICAS_RATIO = ('sharpe', 'sortino', 'beta')
+
+
+def _formatear_metricas_activo(metricas: dict) -> dict:
+    """
+    Formatea en bloque las métricas de las tarjetas del detalle de activo.
+    
+    Equivale a Formatters.format_percentage / format_sharpe / format_beta
+    ('-' para NaN), pero con una sola pasada de np.char por grupo.
+    """
+    pct = np.array([metricas.get(k, 0) for k in _METRICAS_PCT], dtype=float) * 100
+    ratio = np.array([metricas.get(k, 0) for k in _METRICAS_RATIO], dtype=float)
+    
+    fmt = dict(zip(
+        _METRICAS_PCT,
+        np.where(np.isnan(pct), '-', np.char.mod('%.2f%%', pct)).tolist()
+    ))
+    fmt.update(zip(
+        _METRICAS_RATIO,
+        np.where(np.isnan(ratio), '-', np.char.mod('%.2f', ratio)).tolist()
+    ))
+    return fmt
+
+
 def _render_detalle_activo(
     df_precios: pd.DataFrame,
     ticker: str,
@@ -148,27 +251,29 @@ def _render_detalle_activo(
     st.subheader(f"Detalle: {ticker}")
     
     # Métricas en cards
+    fmt = _formatear_metricas_activo(metricas)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Retorno Total", Formatters.format_percentage(metricas.get('retorno_total', 0)))
+        st.metric("Retorno Total", fmt['retorno_total'])
     with col2:
-        st.metric("CAGR", Formatters.format_percentage(metricas.get('cagr', 0)))
+        st.metric("CAGR", fmt['cagr'])
     with col3:
-        st.metric("Volatilidad", Formatters.format_percentage(metricas.get('volatilidad', 0)))
+        st.metric("Volatilidad", fmt['volatilidad'])
     with col4:
-        st.metric("Sharpe", Formatters.format_sharpe(metricas.get('sharpe', 0)))
+        st.metric("Sharpe", fmt['sharpe'])
     
     col5, col6, col7, col8 = st.columns(4)
     
     with col5:
-        st.metric("Max Drawdown", Formatters.format_percentage(metricas.get('max_drawdown', 0)))
+        st.metric("Max Drawdown", fmt['max_drawdown'])
     with col6:
-        st.metric("Sortino", Formatters.format_sharpe(metricas.get('sortino', 0)))
+        st.metric("Sortino", fmt['sortino'])
     with col7:
-        st.metric("Beta", Formatters.format_beta(metricas.get('beta', 0)))
+        st.metric("Beta", fmt['beta'])
     with col8:
-        st.metric("Win Rate", Formatters.format_percentage(metricas.get('win_rate', 0)))
+        st.metric("Win Rate", fmt['win_rate'])
     
     st.divider()
     
@@ -193,27 +298,20 @@ def _render_detalle_activo(
         st.markdown("**Drawdown**")
         if ticker in df_precios.columns:
             precios = df_precios[ticker].dropna()
-            rolling_max = precios.cummax()
-            drawdown = (precios - rolling_max) / rolling_max
+            drawdown_pct = ChartFactory.compute_drawdown(precios)
 
             # Crear gráfico de drawdown manualmente
             import plotly.graph_objects as go
             fig = go.Figure()
             fig.add_trace(go.Scatter(
                 x=precios.index,
-                y=drawdown * 100,
+                y=drawdown_pct,
                 fill='tozeroy',
                 name='Drawdown',
                 line=dict(color='#E53935'),
                 fillcolor='rgba(229, 57, 53, 0.3)'
             ))
-            fig.update_layout(
-                xaxis_title="Fecha",
-                yaxis_title="Drawdown (%)",
-                height=300,
-                margin=dict(l=20, r=20, t=20, b=20),
-                template='plotly_white'
-            )
+            fig.update_layout(**_DRAWDOWN_LAYOUT)
             st.plotly_chart(fig, use_container_width=True)
 
 
@@ -241,23 +339,22 @@ def _render_retornos_mensuales_activo(df_precios: pd.DataFrame, ticker: str):
         month_names = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun',
                       'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
 
+        # Texto de celdas formateado en bloque con np.char (sin bucle Python)
+        valores_pct = pivot.to_numpy(dtype=float) * 100
+        texto = np.where(np.isnan(valores_pct), '', np.char.mod('%.1f%%', valores_pct))
+
         fig = go.Figure(data=go.Heatmap(
-            z=pivot.values * 100,
+            z=valores_pct,
             x=[month_names[m-1] for m in pivot.columns],
             y=pivot.index,
             colorscale='RdYlGn',
             zmid=0,
-            text=[[f'{v*100:.1f}%' if pd.notna(v) else '' for v in row] for row in pivot.values],
+            text=texto,
             texttemplate='%{text}',
             textfont={'size': 10},
             hovertemplate='Año: %{y}<br>Mes: %{x}<br>Retorno: %{z:.1f}%<extra></extra>'
         ))
-        fig.update_layout(
-            xaxis_title='Mes',
-            yaxis_title='Año',
-            height=300,
-            margin=dict(l=50, r=20, t=30, b=50)
-        )
+        fig.update_layout(**_HEATMAP_LAYOUT)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -270,11 +367,7 @@ def _render_retornos_mensuales_activo(df_precios: pd.DataFrame, ticker: str):
             title="",
             labels={'value': 'Retorno Mensual', 'count': 'Frecuencia'}
         )
-        fig.update_layout(
-            showlegend=False,
-            height=300,
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
+        fig.update_layout(**_HISTOGRAM_LAYOUT)
         st.plotly_chart(fig, use_container_width=True)
 
 
@@ -294,26 +387,23 @@ def _render_retornos_anuales_activo(df_precios: pd.DataFrame, ticker: str):
         'Año': ret_anual.index.year,
         'Retorno': ret_anual.values
     })
-    df_anual['Retorno Fmt'] = df_anual['Retorno'].apply(Formatters.format_percentage)
+    df_anual['Retorno Fmt'] = Formatters.format_percentage_series(df_anual['Retorno'])
     
     # Crear gráfico de barras de retornos anuales
     import plotly.graph_objects as go
 
+    ret_anual_pct = ret_anual.to_numpy(dtype=float) * 100
+
     fig = go.Figure()
     fig.add_trace(go.Bar(
         x=ret_anual.index.year,
-        y=ret_anual.values * 100,
+        y=ret_anual_pct,
         marker_color='#1E88E5',
-        text=[f'{v*100:.1f}%' for v in ret_anual.values],
+        text=np.char.mod('%.1f%%', ret_anual_pct),
         textposition='auto',
         hovertemplate='%{x}: %{y:.1f}%<extra></extra>'
     ))
-    fig.update_layout(
-        xaxis_title='Año',
-        yaxis_title='Retorno (%)',
-        height=300,
-        margin=dict(l=50, r=20, t=30, b=50)
-    )
+    fig.update_layout(**_ANNUAL_LAYOUT)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -346,10 +436,13 @@ def render_metrics_view(
         # Obtener tickers del portafolio
         tickers = df_portafolio['ticker'].tolist()
         
-        # Calcular métricas para cada activo
+        # Calcular métricas para cada activo (betas en una sola pasada)
+        betas = _calcular_betas(df_precios, tickers)
         metricas_list = []
         for ticker in tickers:
-            metricas = _calcular_metricas_activo(df_precios, ticker)
+            metricas = _calcular_metricas_activo(
+                df_precios, ticker, beta=betas.get(ticker, 0)
+            )
             if metricas:
                 metricas_list.append(metricas)
         
@@ -358,6 +451,7 @@ def render_metrics_view(
             return None
         
         df_metricas = pd.DataFrame(metricas_list)
+        metricas_por_ticker = {m['ticker']: m for m in metricas_list}
         
         # Tabla de métricas
         _render_tabla_metricas_activos(df_metricas)
@@ -368,7 +462,7 @@ def render_metrics_view(
         ticker_seleccionado = _render_selector_activo(tickers)
         
         if ticker_seleccionado:
-            metricas_activo = df_metricas[df_metricas['ticker'] == ticker_seleccionado].iloc[0].to_dict()
+            metricas_activo = metricas_por_ticker.get(ticker_seleccionado, {})
             
             st.divider()
             
@@ -9,6 +9,8 @@ Muestra:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
 from typing import Optional
 
 from core.data_loader import DataLoader
@@ -16,44 +18,87 @@ from core.portfolio_selector import PortfolioSelector
 from utils.formatters import Formatters, ColorPalette
 from utils.charts import ChartFactory
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def _ordenar_portafolio(df_portafolio: pd.DataFrame) -> pd.DataFrame:
+    """
+    Devuelve una copia del portafolio ordenada por peso descendente.
+    
+    Es la única copia/orden del render: la tabla, las métricas, los
+    gráficos y el detalle por segmento reutilizan este mismo DataFrame.
+    """
+    df = df_portafolio.sort_values('peso', ascending=False).reset_index(drop=True)
+    if HAS_PYARROW:
+        # Strings respaldados por Arrow: menos memoria y groupby más rápido
+        df = df.astype({'ticker': 'string[pyarrow]', 'segmento': 'string[pyarrow]'})
+    return df
+
 
 def _crear_tabla_portafolio(
-    df_portafolio: pd.DataFrame, 
+    df_ordenado: pd.DataFrame, 
     monto_inversion: float
 ) -> pd.DataFrame:
     """
     Crea la tabla formateada del portafolio.
     
     Args:
-        df_portafolio: DataFrame con ticker, peso, segmento
+        df_ordenado: DataFrame con ticker, peso, segmento ya ordenado
+            (ver _ordenar_portafolio); se le agrega la columna 'monto'
         monto_inversion: Monto total a invertir
         
     Returns:
         DataFrame formateado para mostrar
     """
     # Calcular montos
-    df = df_portafolio.copy()
+    df = df_ordenado
     df['monto'] = df['peso'] * monto_inversion
     
-    # Ordenar por peso descendente
-    df = df.sort_values('peso', ascending=False).reset_index(drop=True)
-    
     # Crear DataFrame formateado para display
     df_display = pd.DataFrame({
-        '#': range(1, len(df) + 1),
+        '#': np.arange(1, len(df) + 1, dtype=np.int32),
         'Ticker': df['ticker'],
-        'Segmento': df['segmento'].apply(lambda x: f"Seg. {x}"),
-        'Peso (%)': df['peso'].apply(lambda x: f"{x*100:.1f}%"),
-        'Monto (USD)': df['monto'].apply(lambda x: f"${x:,.2f}"),
+        'Segmento': 'Seg. ' + df['segmento'].astype(str),
+        'Peso (%)': df['peso'].mul(100).map('{:.1f}%'.format),
+        'Monto (USD)': df['monto'].map('${:,.2f}'.format),
     })
     
     return df_display, df
 
 
+@st.cache_data(show_spinner=False, max_entries=8, ttl=1800)
+def _build_portfolio_payload(
+    perfil: str,
+    monto_inversion: float,
+    _portfolio_selector: PortfolioSelector
+) -> Optional[tuple]:
+    """
+    Selecciona el portafolio y arma su tabla (cacheado por perfil y monto).
+    
+    El prefijo '_' excluye al selector del hash de Streamlit; es una
+    instancia compartida vía st.cache_resource.
+    
+    Returns:
+        Tupla (df_display, df_completo) o None si no hay datos; df_completo
+        está ordenado por peso y lo comparten todas las secciones del render
+    """
+    df_portafolio = _portfolio_selector.seleccionar_portafolio(perfil)
+    
+    if df_portafolio is None or df_portafolio.empty:
+        return None
+    
+    return _crear_tabla_portafolio(_ordenar_portafolio(df_portafolio), monto_inversion)
+
+
 def _render_metricas_resumen(df_portafolio: pd.DataFrame, monto_inversion: float):
     """Renderiza las métricas resumen del portafolio."""
     n_activos = len(df_portafolio)
-    n_segmentos = df_portafolio['segmento'].nunique()
+    # np.unique sobre el array: evita la maquinaria de nunique en ~10 filas
+    n_segmentos = len(np.unique(df_portafolio['segmento'].dropna().to_numpy(dtype=str)))
     peso_max = df_portafolio['peso'].max() * 100
     peso_min = df_portafolio['peso'].min() * 100
     
@@ -117,42 +162,77 @@ def _render_tabla_activos(df_display: pd.DataFrame):
     )
 
 
+@st.cache_data(show_spinner=False)
+def _datos_distribucion(tickers: tuple, pesos: tuple, segmentos: tuple) -> dict:
+    """
+    Prepara los valores, etiquetas y colores de los dos pie charts.
+    
+    Recibe tuplas (hashables) para que Streamlit cachee por contenido.
+    """
+    pesos_arr = np.asarray(pesos, dtype=np.float64)
+    
+    # Agrupar por segmento: códigos enteros ordenados + bincount
+    # (mismo orden y sumas que groupby('segmento'), sin el Grouper)
+    codigos, nombres = pd.factorize(pd.Series(segmentos, dtype=object), sort=True)
+    validos = codigos >= 0
+    sumas = np.bincount(codigos[validos], weights=pesos_arr[validos], minlength=len(nombres))
+    
+    nombres_str = [str(nombre) for nombre in nombres]
+    colors = [ColorPalette.get_segment_color(nombre) for nombre in nombres_str]
+    
+    return {
+        'activos_values': tuple((pesos_arr * 100).tolist()),
+        'activos_labels': tuple(tickers),
+        'segmentos_values': tuple((sumas * 100).tolist()),
+        'segmentos_labels': tuple('Segmento ' + nombre for nombre in nombres_str),
+        # Colores por segmento
+        'segmentos_colors': tuple(colors),
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _crear_pie(
+    values: tuple,
+    labels: tuple,
+    colors: Optional[tuple] = None,
+    hole: float = 0.4
+) -> go.Figure:
+    """
+    Pie chart cacheado como recurso: en un rerun con los mismos pesos y
+    etiquetas se reutiliza la misma Figure (st.plotly_chart solo la serializa).
+    """
+    return ChartFactory.create_pie_chart(
+        values=list(values),
+        labels=list(labels),
+        title=None,
+        hole=hole,
+        colors=list(colors) if colors else None
+    )
+
+
 def _render_graficos_distribucion(df_portafolio: pd.DataFrame, perfil: str):
     """Renderiza los gráficos de distribución."""
+    datos = _datos_distribucion(
+        tuple(df_portafolio['ticker']),
+        tuple(df_portafolio['peso']),
+        tuple(df_portafolio['segmento'])
+    )
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Distribucion por Activo")
         
-        # Preparar datos para el pie chart
-        df_pie = df_portafolio.copy()
-        df_pie['peso_pct'] = df_pie['peso'] * 100
-        
-        fig_activos = ChartFactory.create_pie_chart(
-            values=df_pie['peso_pct'].tolist(),
-            labels=df_pie['ticker'].tolist(),
-            title=None,
-            hole=0.4
-        )
+        fig_activos = _crear_pie(datos['activos_values'], datos['activos_labels'])
         st.plotly_chart(fig_activos, use_container_width=True, key='pie_activos')
     
     with col2:
         st.subheader("Distribucion por Segmento")
         
-        # Agrupar por segmento
-        df_segmento = df_portafolio.groupby('segmento')['peso'].sum().reset_index()
-        df_segmento['peso_pct'] = df_segmento['peso'] * 100
-        df_segmento['label'] = df_segmento['segmento'].apply(lambda x: f"Segmento {x}")
-        
-        # Colores por segmento
-        colors = [ColorPalette.get_segment_color(s) for s in df_segmento['segmento']]
-        
-        fig_segmentos = ChartFactory.create_pie_chart(
-            values=df_segmento['peso_pct'].tolist(),
-            labels=df_segmento['label'].tolist(),
-            title=None,
-            hole=0.4,
-            colors=colors
+        fig_segmentos = _crear_pie(
+            datos['segmentos_values'],
+            datos['segmentos_labels'],
+            datos['segmentos_colors']
         )
         st.plotly_chart(fig_segmentos, use_container_width=True, key='pie_segmentos')
 
@@ -160,20 +240,21 @@ def _render_graficos_distribucion(df_portafolio: pd.DataFrame, perfil: str):
 def _render_detalle_segmentos(df_portafolio: pd.DataFrame):
     """Renderiza el detalle por segmentos en un expander."""
     with st.expander("Detalle por Segmento", expanded=False):
-        # Agrupar por segmento
-        for segmento in sorted(df_portafolio['segmento'].unique()):
-            df_seg = df_portafolio[df_portafolio['segmento'] == segmento]
-            peso_total = df_seg['peso'].sum() * 100
-            tickers = ', '.join(df_seg['ticker'].tolist())
-            
-            color = ColorPalette.get_segment_color(segmento)
-            
-            st.markdown(f"""
-            **Segmento {segmento}** ({peso_total:.1f}%)
-            - Activos: {tickers}
-            - Cantidad: {len(df_seg)} activos
-            """)
-            st.divider()
+        # Agrupar por segmento (una sola pasada) y emitir un único markdown
+        resumen = df_portafolio.groupby('segmento', sort=True).agg(
+            peso=('peso', 'sum'),
+            tickers=('ticker', ', '.join),
+            cantidad=('ticker', 'size'),
+        )
+        
+        bloques = [
+            f"**Segmento {segmento}** ({peso * 100:.1f}%)\n"
+            f"- Activos: {tickers}\n"
+            f"- Cantidad: {cantidad} activos\n\n"
+            "---\n\n"
+            for segmento, peso, tickers, cantidad in resumen.itertuples()
+        ]
+        st.markdown(''.join(bloques))
 
 
 def render_portfolio_view(
@@ -197,31 +278,30 @@ def render_portfolio_view(
     st.header(f"Portafolio {perfil.title()}")
     
     try:
-        # Obtener portafolio
-        df_portafolio = portfolio_selector.seleccionar_portafolio(perfil)
+        # Obtener portafolio y tabla formateada
+        payload = _build_portfolio_payload(perfil, monto_inversion, portfolio_selector)
         
-        if df_portafolio is None or df_portafolio.empty:
+        if payload is None:
             st.error(f"No se encontró portafolio para el perfil: {perfil}")
             return None
         
+        df_display, df_completo = payload
+        
         # Métricas resumen
-        _render_metricas_resumen(df_portafolio, monto_inversion)
+        _render_metricas_resumen(df_completo, monto_inversion)
         
         st.divider()
         
-        # Crear tabla formateada
-        df_display, df_completo = _crear_tabla_portafolio(df_portafolio, monto_inversion)
-        
         # Tabla de activos
         _render_tabla_activos(df_display)
         
         st.divider()
         
         # Gráficos de distribución
-        _render_graficos_distribucion(df_portafolio, perfil)
+        _render_graficos_distribucion(df_completo, perfil)
         
         # Detalle por segmentos
-        _render_detalle_segmentos(df_portafolio)
+        _render_detalle_segmentos(df_completo)
         
         return df_completo
         
@@ -252,12 +332,12 @@ def render_portfolio_comparison(
         st.subheader(f"{perfil1.title()}")
         df1 = portfolio_selector.seleccionar_portafolio(perfil1)
         if df1 is not None:
-            df_display1, _ = _crear_tabla_portafolio(df1, monto_inversion)
+            df_display1, _ = _crear_tabla_portafolio(_ordenar_portafolio(df1), monto_inversion)
             st.dataframe(df_display1, use_container_width=True, hide_index=True)
     
     with col2:
         st.subheader(f"{perfil2.title()}")
         df2 = portfolio_selector.seleccionar_portafolio(perfil2)
         if df2 is not None:
-            df_display2, _ = _crear_tabla_portafolio(df2, monto_inversion)
+            df_display2, _ = _crear_tabla_portafolio(_ordenar_portafolio(df2), monto_inversion)
             st.dataframe(df_display2, use_container_width=True, hide_index=True)
@@ -9,7 +9,7 @@ Maneja:
 """
 
 import streamlit as st
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import Optional, Literal
 
 # Configuración de perfiles disponibles
@@ -48,10 +48,25 @@ HORIZONTES_DISPONIBLES = {
     '5_anios': {'nombre': '5 Años', 'meses': 60},
 }
 
+# Opciones de los selectores: constantes, se arman una sola vez al importar
+_PERFIL_KEYS = tuple(PERFILES_DISPONIBLES.keys())
+_PERFIL_NOMBRES = tuple(v['nombre'] for v in PERFILES_DISPONIBLES.values())
+_HORIZONTE_KEYS = tuple(HORIZONTES_DISPONIBLES.keys())
+_HORIZONTE_NOMBRES = tuple(v['nombre'] for v in HORIZONTES_DISPONIBLES.values())
 
-@dataclass
+# Perfil actual -> (opciones, nombres) para comparar, sin el propio perfil
+_OPCIONES_COMPARACION = {
+    perfil: (
+        tuple(p for p in _PERFIL_KEYS if p != perfil),
+        tuple(PERFILES_DISPONIBLES[p]['nombre'] for p in _PERFIL_KEYS if p != perfil),
+    )
+    for perfil in _PERFIL_KEYS
+}
+
+
+@dataclass(frozen=True, slots=True)
 class SidebarConfig:
-    """Configuración resultante del sidebar."""
+    """Configuración resultante del sidebar (inmutable y hashable)."""
     perfil: str
     monto_inversion: float
     horizonte: str
@@ -63,25 +78,15 @@ class SidebarConfig:
     
     def to_dict(self) -> dict:
         """Convierte la configuración a diccionario."""
-        return {
-            'perfil': self.perfil,
-            'monto_inversion': self.monto_inversion,
-            'horizonte': self.horizonte,
-            'horizonte_meses': self.horizonte_meses,
-            'mostrar_benchmark': self.mostrar_benchmark,
-            'tipo_grafico': self.tipo_grafico,
-            'modo_comparacion': self.modo_comparacion,
-            'perfil_comparacion': self.perfil_comparacion,
-        }
+        return asdict(self)
 
 
 def _render_perfil_selector() -> str:
     """Renderiza el selector de perfil de riesgo."""
     st.subheader("Perfil de Riesgo")
     
-    # Crear opciones para el selectbox
-    opciones = list(PERFILES_DISPONIBLES.keys())
-    nombres = [PERFILES_DISPONIBLES[p]['nombre'] for p in opciones]
+    opciones = _PERFIL_KEYS
+    nombres = _PERFIL_NOMBRES
     
     # Selector principal
     indice = st.selectbox(
@@ -127,8 +132,8 @@ def _render_horizonte_selector() -> tuple[str, int]:
     """Renderiza el selector de horizonte temporal."""
     st.subheader("Horizonte de Inversion")
     
-    opciones = list(HORIZONTES_DISPONIBLES.keys())
-    nombres = [HORIZONTES_DISPONIBLES[h]['nombre'] for h in opciones]
+    opciones = _HORIZONTE_KEYS
+    nombres = _HORIZONTE_NOMBRES
     
     indice = st.selectbox(
         "Período de inversión",
@@ -187,15 +192,10 @@ def _render_modo_comparacion(perfil_actual: str) -> tuple[bool, Optional[str]]:
     perfil_comparacion = None
     
     if modo_comparacion:
-        # Filtrar el perfil actual de las opciones
-        opciones_comparacion = [
-            p for p in PERFILES_DISPONIBLES.keys() 
-            if p != perfil_actual
-        ]
-        nombres_comparacion = [
-            PERFILES_DISPONIBLES[p]['nombre'] 
-            for p in opciones_comparacion
-        ]
+        # Opciones sin el perfil actual (precalculadas por perfil)
+        opciones_comparacion, nombres_comparacion = _OPCIONES_COMPARACION.get(
+            perfil_actual, (_PERFIL_KEYS, _PERFIL_NOMBRES)
+        )
         
         if opciones_comparacion:
             indice = st.selectbox(
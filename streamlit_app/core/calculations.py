@@ -1,11 +1,137 @@
 """
 Portfolio Calculations Module - Dynamic calculations for analysis
 """
+import functools
+import importlib.util
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# numba is optional and slow to import (~100 ms); only probe for it here and
+# import it the first time a rolling kernel is actually needed
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# (label, column, fallback column, format spec) for get_metrics_comparison
+_PORTFOLIO_SPEC = (
+    ('Return Total', 'Return_Portfolio', None, '.2%'),
+    ('Return Anualizado', 'Return_Annual_Portfolio', 'Return_Portfolio', '.2%'),
+    ('Volatilidad', 'Volatility_Portfolio', None, '.2%'),
+    ('Sharpe Ratio', 'Sharpe_Portfolio', None, '.2f'),
+    ('Max Drawdown', 'MaxDD_Portfolio', None, '.2%'),
+)
+
+_BENCHMARK_SPEC = (
+    ('Return Total', 'Return_Benchmark', None, '.2%'),
+    ('Return Anualizado', 'Return_Annual_Benchmark', 'Return_Benchmark', '.2%'),
+    ('Volatilidad', 'Volatility_Benchmark', None, '.2%'),
+    ('Sharpe Ratio', 'Sharpe_Benchmark', None, '.2f'),
+    ('Max Drawdown', 'MaxDD_Benchmark', None, '.2%'),
+)
+
+
+def _format_metrics(row: Dict, spec: Tuple) -> Dict[str, str]:
+    """Format a summary row following a (label, column, fallback, fmt) spec."""
+    return {
+        label: format(row[column] if fallback is None else row.get(column, row[fallback]), fmt)
+        for label, column, fallback, fmt in spec
+    }
+
+
+def _period_bounds(fechas: np.ndarray, unit: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    First and last positions of each calendar period in a sorted date array.
+    
+    Args:
+        fechas: Sorted datetime64 array
+        unit: numpy datetime unit for the period ('M' or 'Y')
+        
+    Returns:
+        Tuple (period codes, first positions, last positions)
+    """
+    periods = fechas.astype(f'datetime64[{unit}]')
+    change = periods[1:] != periods[:-1]
+    first = np.flatnonzero(np.r_[True, change])
+    last = np.flatnonzero(np.r_[change, True])
+    return periods[first], first, last
+
+
+def _rolling_mean_std_loop(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and sample std (ddof=1) in a single sliding-window pass.
+    
+    Windows containing NaN yield NaN, matching Series.rolling(window).
+    """
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    sum_x = 0.0
+    sum_x2 = 0.0
+    n_valid = 0
+    for i in range(n):
+        v = x[i]
+        if not np.isnan(v):
+            sum_x += v
+            sum_x2 += v * v
+            n_valid += 1
+        if i >= window:
+            old = x[i - window]
+            if not np.isnan(old):
+                sum_x -= old
+                sum_x2 -= old * old
+                n_valid -= 1
+        if i >= window - 1 and n_valid == window:
+            m = sum_x / window
+            var = (sum_x2 - sum_x * m) / (window - 1)
+            mean[i] = m
+            std[i] = np.sqrt(var) if var > 0.0 else 0.0
+    return mean, std
+
+
+def _rolling_mean_std_numpy(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """NumPy fallback of _rolling_mean_std_loop using cumulative sums."""
+    valid = ~np.isnan(x)
+    xz = np.where(valid, x, 0.0)
+    c1 = np.concatenate(([0.0], np.cumsum(xz)))
+    c2 = np.concatenate(([0.0], np.cumsum(xz * xz)))
+    cn = np.concatenate(([0], np.cumsum(valid)))
+    
+    sum_x = c1[window:] - c1[:-window]
+    sum_x2 = c2[window:] - c2[:-window]
+    full = (cn[window:] - cn[:-window]) == window
+    
+    m = sum_x / window
+    var = np.maximum((sum_x2 - sum_x * m) / (window - 1), 0.0)
+    
+    pad = np.full(window - 1, np.nan)
+    mean = np.concatenate((pad, np.where(full, m, np.nan)))
+    std = np.concatenate((pad, np.where(full, np.sqrt(var), np.nan)))
+    return mean, std
+
+
+@functools.lru_cache(maxsize=1)
+def _rolling_kernel():
+    """Pick the rolling mean/std kernel on first use (lazy numba import)."""
+    if HAS_NUMBA:
+        try:
+            from numba import njit
+            return njit(cache=True)(_rolling_mean_std_loop)
+        except ImportError:
+            pass
+    return _rolling_mean_std_numpy
+
+
+def _rolling_mean_std(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and sample std, numba-compiled when available."""
+    return _rolling_kernel()(x, window)
+
 
 class PortfolioCalculations:
     """
@@ -21,8 +147,45 @@ class PortfolioCalculations:
             equity_curves: Daily equity values for all profiles
             backtest_summary: Summary metrics from pipeline
         """
+        # Single stable sort by (perfil, fecha); groups come out in date
+        # order and no method needs to sort again
+        if not equity_curves.empty:
+            if HAS_PYARROW:
+                # Arrow-backed strings: contiguous buffers, faster groupby
+                equity_curves = equity_curves.astype({'perfil': 'string[pyarrow]'})
+            equity_curves = equity_curves.sort_values(
+                ['perfil', 'fecha'], kind='mergesort'
+            ).reset_index(drop=True)
+        
         self.equity_curves = equity_curves
         self.backtest_summary = backtest_summary
+        
+        # Pre-grouped curves per profile: lookups are O(1) instead of
+        # filtering the whole DataFrame on every call
+        self._by_profile = {
+            perfil: grupo.reset_index(drop=True)
+            for perfil, grupo in equity_curves.groupby('perfil', sort=False)
+        } if not equity_curves.empty else {}
+        
+        # Contiguous per-profile arrays: sorted datetime64 dates for
+        # O(log N) date slicing and float64 equity for the drawdown/rolling
+        # passes (returns and peaks keep full precision)
+        self._arrays = {
+            perfil: {
+                'fecha': grupo['fecha'].to_numpy(),
+                'eq_p': np.ascontiguousarray(grupo['equity_portafolio'].to_numpy(dtype=np.float64)),
+                'eq_b': np.ascontiguousarray(grupo['equity_benchmark'].to_numpy(dtype=np.float64)),
+            }
+            for perfil, grupo in self._by_profile.items()
+        }
+        
+        # First summary row per profile as a plain dict (same row as
+        # filtering + iloc[0], without scanning the DataFrame per call)
+        self._summary_by_profile = (
+            backtest_summary.drop_duplicates('perfil')
+            .set_index('perfil')
+            .to_dict('index')
+        ) if not backtest_summary.empty else {}
     
     def get_equity_curve_for_profile(self, profile: str) -> pd.DataFrame:
         """
@@ -34,15 +197,21 @@ class PortfolioCalculations:
         Returns:
             DataFrame with fecha, equity_portafolio, equity_benchmark
         """
-        df = self.equity_curves[self.equity_curves['perfil'] == profile].copy()
-        df = df.sort_values('fecha')
+        return self._profile_frame(profile).copy()
+    
+    def _profile_frame(self, profile: str) -> pd.DataFrame:
+        """Cached (sorted) equity curve for a profile. Must not be mutated."""
+        df = self._by_profile.get(profile)
+        if df is None:
+            return self.equity_curves.iloc[0:0]
         return df
     
     def calculate_cumulative_returns(
         self,
         profile: str,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        with_excess: bool = True
     ) -> pd.DataFrame:
         """
         Calculate cumulative returns for portfolio vs benchmark.
@@ -51,29 +220,44 @@ class PortfolioCalculations:
             profile: Profile name
             start_date: Optional start date filter
             end_date: Optional end date filter
+            with_excess: Include the excess_return_pct column
             
         Returns:
-            DataFrame with cumulative returns
+            DataFrame with fecha, equity columns and cumulative returns
         """
-        df = self.get_equity_curve_for_profile(profile)
-        
-        if start_date:
-            df = df[df['fecha'] >= start_date]
-        if end_date:
-            df = df[df['fecha'] <= end_date]
+        df = self._profile_frame(profile)
+        arrays = self._arrays.get(profile)
+        
+        if arrays is not None and (start_date or end_date):
+            dates = arrays['fecha']
+            # Frames are sorted by fecha: binary search instead of masks
+            lo = np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64()) if start_date else 0
+            hi = (
+                np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side='right')
+                if end_date else len(dates)
+            )
+            df = df.iloc[lo:hi]
         
         if df.empty:
-            return df
+            return df.copy()
         
         # Calculate cumulative returns from starting equity
-        initial_portfolio = df['equity_portafolio'].iloc[0]
-        initial_benchmark = df['equity_benchmark'].iloc[0]
-        
-        df['return_portfolio_pct'] = (df['equity_portafolio'] / initial_portfolio - 1) * 100
-        df['return_benchmark_pct'] = (df['equity_benchmark'] / initial_benchmark - 1) * 100
-        df['excess_return_pct'] = df['return_portfolio_pct'] - df['return_benchmark_pct']
+        eq_p = df['equity_portafolio'].to_numpy()
+        eq_b = df['equity_benchmark'].to_numpy()
+        ret_p = (eq_p / eq_p[0] - 1) * 100
+        ret_b = (eq_b / eq_b[0] - 1) * 100
+        
+        columns = {
+            'fecha': df['fecha'].to_numpy(),
+            'equity_portafolio': eq_p,
+            'equity_benchmark': eq_b,
+            'return_portfolio_pct': ret_p,
+            'return_benchmark_pct': ret_b,
+        }
+        if with_excess:
+            columns['excess_return_pct'] = ret_p - ret_b
         
-        return df
+        return pd.DataFrame(columns)
     
     def calculate_monthly_returns(self, profile: str) -> pd.DataFrame:
         """
@@ -85,21 +269,30 @@ class PortfolioCalculations:
         Returns:
             DataFrame with monthly returns
         """
-        df = self.get_equity_curve_for_profile(profile)
+        df = self._profile_frame(profile)
         
         if df.empty:
-            return df
-        
-        df = df.set_index('fecha')
-        
-        # Resample to monthly and calculate returns
-        monthly = df.resample('M').last()
-        
-        monthly['return_portfolio'] = monthly['equity_portafolio'].pct_change()
-        monthly['return_benchmark'] = monthly['equity_benchmark'].pct_change()
-        monthly['excess_return'] = monthly['return_portfolio'] - monthly['return_benchmark']
-        
-        monthly = monthly.reset_index()
+            return df.copy()
+        
+        # Last observation of each month (frames are pre-sorted by fecha)
+        months, _, last = _period_bounds(df['fecha'].to_numpy(), 'M')
+        eq_p = df['equity_portafolio'].to_numpy()[last]
+        eq_b = df['equity_benchmark'].to_numpy()[last]
+        
+        ret_p = eq_p[1:] / eq_p[:-1] - 1
+        ret_b = eq_b[1:] / eq_b[:-1] - 1
+        
+        # Month-end labels, as resample('M') produced
+        month_end = (months[1:] + np.timedelta64(1, 'M')).astype('datetime64[D]') - np.timedelta64(1, 'D')
+        
+        monthly = pd.DataFrame({
+            'fecha': pd.to_datetime(month_end),
+            'equity_portafolio': eq_p[1:],
+            'equity_benchmark': eq_b[1:],
+            'return_portfolio': ret_p,
+            'return_benchmark': ret_b,
+            'excess_return': ret_p - ret_b,
+        })
         monthly['year'] = monthly['fecha'].dt.year
         monthly['month'] = monthly['fecha'].dt.month
         monthly['month_name'] = monthly['fecha'].dt.strftime('%b')
@@ -116,23 +309,22 @@ class PortfolioCalculations:
         Returns:
             DataFrame with annual returns
         """
-        df = self.get_equity_curve_for_profile(profile)
+        df = self._profile_frame(profile)
         
         if df.empty:
-            return df
-        
-        df = df.set_index('fecha')
+            return df.copy()
         
-        # Get first and last values per year
-        yearly_first = df.resample('Y').first()
-        yearly_last = df.resample('Y').last()
+        # Get first and last values per year (frames are pre-sorted by fecha)
+        years, first, last = _period_bounds(df['fecha'].to_numpy(), 'Y')
+        eq_p = df['equity_portafolio'].to_numpy()
+        eq_b = df['equity_benchmark'].to_numpy()
         
         annual = pd.DataFrame({
-            'year': yearly_last.index.year,
-            'equity_start_portfolio': yearly_first['equity_portafolio'].values,
-            'equity_end_portfolio': yearly_last['equity_portafolio'].values,
-            'equity_start_benchmark': yearly_first['equity_benchmark'].values,
-            'equity_end_benchmark': yearly_last['equity_benchmark'].values,
+            'year': years.astype(int) + 1970,
+            'equity_start_portfolio': eq_p[first],
+            'equity_end_portfolio': eq_p[last],
+            'equity_start_benchmark': eq_b[first],
+            'equity_end_benchmark': eq_b[last],
         })
         
         annual['return_portfolio'] = (
@@ -153,26 +345,32 @@ class PortfolioCalculations:
             profile: Profile name
             
         Returns:
-            DataFrame with drawdown values
+            DataFrame with fecha, equity columns, peaks and drawdown values
         """
-        df = self.get_equity_curve_for_profile(profile)
+        df = self._profile_frame(profile)
         
         if df.empty:
-            return df
+            return df.copy()
         
-        # Calculate running maximum
-        df['peak_portfolio'] = df['equity_portafolio'].cummax()
-        df['peak_benchmark'] = df['equity_benchmark'].cummax()
+        arrays = self._arrays[profile]
+        eq_p = arrays['eq_p']
+        eq_b = arrays['eq_b']
         
-        # Calculate drawdown
-        df['drawdown_portfolio'] = (
-            df['equity_portafolio'] / df['peak_portfolio'] - 1
-        ) * 100
-        df['drawdown_benchmark'] = (
-            df['equity_benchmark'] / df['peak_benchmark'] - 1
-        ) * 100
+        # Calculate running maximum; fmax skips NaN like Series.cummax (and
+        # ChartFactory.compute_drawdown), and NaN days keep a NaN peak
+        peak_p = np.where(np.isnan(eq_p), np.nan, np.fmax.accumulate(eq_p))
+        peak_b = np.where(np.isnan(eq_b), np.nan, np.fmax.accumulate(eq_b))
         
-        return df
+        # Calculate drawdown
+        return pd.DataFrame({
+            'fecha': arrays['fecha'],
+            'equity_portafolio': df['equity_portafolio'].to_numpy(),
+            'equity_benchmark': df['equity_benchmark'].to_numpy(),
+            'peak_portfolio': peak_p,
+            'peak_benchmark': peak_b,
+            'drawdown_portfolio': (eq_p / peak_p - 1) * 100,
+            'drawdown_benchmark': (eq_b / peak_b - 1) * 100,
+        })
     
     def calculate_rolling_metrics(
         self,
@@ -189,33 +387,37 @@ class PortfolioCalculations:
         Returns:
             DataFrame with rolling metrics
         """
-        df = self.get_equity_curve_for_profile(profile)
+        df = self._profile_frame(profile)
         
         if df.empty or len(df) < window_days:
-            return df
+            return df.copy()
         
-        df = df.set_index('fecha').copy()
+        arrays = self._arrays[profile]
+        eq_p = arrays['eq_p']
+        eq_b = arrays['eq_b']
         
         # Calculate daily returns
-        df['daily_return_portfolio'] = df['equity_portafolio'].pct_change()
-        df['daily_return_benchmark'] = df['equity_benchmark'].pct_change()
-        
-        # Rolling metrics
-        risk_free_daily = 0.05 / 252  # 5% annual risk-free rate
-        
-        df['rolling_vol_portfolio'] = (
-            df['daily_return_portfolio'].rolling(window_days).std() * np.sqrt(252)
-        )
-        df['rolling_vol_benchmark'] = (
-            df['daily_return_benchmark'].rolling(window_days).std() * np.sqrt(252)
-        )
-        
-        rolling_return = df['daily_return_portfolio'].rolling(window_days).mean() * 252
-        rolling_vol = df['rolling_vol_portfolio']
-        
-        df['rolling_sharpe'] = (rolling_return - 0.05) / rolling_vol
-        
-        return df.reset_index()
+        ret_p = np.concatenate(([np.nan], eq_p[1:] / eq_p[:-1] - 1))
+        ret_b = np.concatenate(([np.nan], eq_b[1:] / eq_b[:-1] - 1))
+        
+        # Rolling metrics: mean and std from one fused pass per series
+        risk_free_annual = 0.05  # 5% annual risk-free rate
+        
+        mean_p, std_p = _rolling_mean_std(ret_p, window_days)
+        _, std_b = _rolling_mean_std(ret_b, window_days)
+        
+        rolling_vol_p = std_p * np.sqrt(252)
+        
+        return pd.DataFrame({
+            'fecha': arrays['fecha'],
+            'equity_portafolio': df['equity_portafolio'].to_numpy(),
+            'equity_benchmark': df['equity_benchmark'].to_numpy(),
+            'daily_return_portfolio': ret_p,
+            'daily_return_benchmark': ret_b,
+            'rolling_vol_portfolio': rolling_vol_p,
+            'rolling_vol_benchmark': std_b * np.sqrt(252),
+            'rolling_sharpe': (mean_p * 252 - risk_free_annual) / rolling_vol_p,
+        })
     
     def get_metrics_comparison(self, profile: str) -> Dict:
         """
@@ -227,32 +429,16 @@ class PortfolioCalculations:
         Returns:
             Dictionary with formatted metrics
         """
-        summary = self.backtest_summary[
-            self.backtest_summary['perfil'] == profile
-        ]
+        row = self._summary_by_profile.get(profile)
         
-        if summary.empty:
+        if row is None:
             return {}
         
-        row = summary.iloc[0]
-        
         return {
-            'portfolio': {
-                'Return Total': f"{row['Return_Portfolio']:.2%}",
-                'Return Anualizado': f"{row.get('Return_Annual_Portfolio', row['Return_Portfolio']):.2%}",
-                'Volatilidad': f"{row['Volatility_Portfolio']:.2%}",
-                'Sharpe Ratio': f"{row['Sharpe_Portfolio']:.2f}",
-                'Max Drawdown': f"{row['MaxDD_Portfolio']:.2%}",
-            },
-            'benchmark': {
-                'Return Total': f"{row['Return_Benchmark']:.2%}",
-                'Return Anualizado': f"{row.get('Return_Annual_Benchmark', row['Return_Benchmark']):.2%}",
-                'Volatilidad': f"{row['Volatility_Benchmark']:.2%}",
-                'Sharpe Ratio': f"{row['Sharpe_Benchmark']:.2f}",
-                'Max Drawdown': f"{row['MaxDD_Benchmark']:.2%}",
-            },
+            'portfolio': _format_metrics(row, _PORTFOLIO_SPEC),
+            'benchmark': _format_metrics(row, _BENCHMARK_SPEC),
             'comparison': {
-                'Excess Return': f"{row['Excess_Return']:.2%}",
+                'Excess Return': format(row['Excess_Return'], '.2%'),
                 'Winner': 'Portafolio' if row['Excess_Return'] > 0 else 'Benchmark',
             }
         }
@@ -274,29 +460,23 @@ class PortfolioCalculations:
         Returns:
             DataFrame with projected values
         """
-        summary = self.backtest_summary[
-            self.backtest_summary['perfil'] == profile
-        ]
+        row = self._summary_by_profile.get(profile)
         
-        if summary.empty:
+        if row is None:
             return pd.DataFrame()
         
-        row = summary.iloc[0]
         annual_return = row.get('Return_Annual_Portfolio', row['Return_Portfolio'] / 2)
         annual_vol = row['Volatility_Portfolio']
         
-        projections = []
-        for year in range(years + 1):
-            expected = initial_investment * ((1 + annual_return) ** year)
-            # Simple confidence intervals
-            lower = initial_investment * ((1 + annual_return - annual_vol) ** year)
-            upper = initial_investment * ((1 + annual_return + annual_vol) ** year)
-            
-            projections.append({
-                'year': year,
-                'expected': expected,
-                'lower_bound': max(0, lower),
-                'upper_bound': upper,
-            })
-        
-        return pd.DataFrame(projections)
+        years_arr = np.arange(years + 1)
+        expected = initial_investment * np.power(1 + annual_return, years_arr)
+        # Simple confidence intervals
+        lower = initial_investment * np.power(1 + annual_return - annual_vol, years_arr)
+        upper = initial_investment * np.power(1 + annual_return + annual_vol, years_arr)
+        
+        return pd.DataFrame({
+            'year': years_arr,
+            'expected': expected,
+            'lower_bound': np.maximum(0.0, lower),
+            'upper_bound': upper,
+        })
@@ -1,16 +1,247 @@
 """
 Data Loader Module - Handles loading and caching of pipeline outputs
 """
+import functools
+import hashlib
+import os
+import tempfile
 import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 import streamlit as st
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+_DATE_COLUMNS = ('fecha', 'Fecha', 'date', 'Date')
+
+# Known schemas: passing them to read_csv skips type inference.
+# Portfolio CSVs carry ~30 feature columns; only these are consumed.
+PORTFOLIO_DTYPES = {
+    'perfil': 'category',
+    'ticker': 'object',
+    'segmento': 'int8',
+    'segmento_nombre': 'category',
+    'peso': 'float64',
+    'score_compuesto': 'float64',
+    'return_annualized': 'float64',
+    'volatility_annual': 'float64',
+    'sharpe_ratio': 'float64',
+    'beta': 'float64',
+    'momentum_6m': 'float64',
+}
+
+SEGMENT_DTYPES = {
+    'segmento': 'int8',
+    'segmento_nombre': 'object',
+    'Activos': 'int16',
+}
+
+SUMMARY_DTYPES = {
+    'perfil': 'object',
+    'Perfil': 'object',
+}
+
+
+# Display-only float columns (segment report) that _optimize_dtypes may
+# store as float32. Anything else that is float64 stays float64.
+_FLOAT32_COLUMNS = frozenset({
+    'Ret. Medio', 'Ret. Std', 'Volatilidad', 'Sharpe', 'Beta', 'Max DD',
+})
+
+
+def _float_dtypes(**overrides) -> defaultdict:
+    """
+    Schema where every column is float64 unless overridden by name.
+    
+    Prices, equity curves and backtest metrics feed returns, drawdowns and
+    ratios, so they keep full precision.
+    """
+    return defaultdict(lambda: 'float64', overrides)
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a freshly parsed frame in place and return it.
+    
+    int64 columns are downcast, low-cardinality strings become ``category``
+    and known date columns are parsed once. Only float columns listed in
+    _FLOAT32_COLUMNS are downcast; the rest feed calculations and exported
+    tables and keep float64.
+    """
+    n_rows = len(df)
+    for col in df.columns:
+        series = df[col]
+        if col in _DATE_COLUMNS:
+            df[col] = pd.to_datetime(series)
+        elif col in _FLOAT32_COLUMNS and series.dtype == 'float64':
+            df[col] = series.astype('float32')
+        elif series.dtype == 'int64':
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == object and n_rows and series.nunique() / n_rows < 0.5:
+            df[col] = series.astype('category')
+    return df
+
+
+# Bump when _optimize_dtypes changes what ends up in the Parquet cache
+_PARQUET_CACHE_VERSION = 3
+
+
+def _stable_repr(value) -> str:
+    """repr() that is identical across processes (callables by qualified name)."""
+    if callable(value):
+        return f'{value.__module__}.{value.__qualname__}'
+    if isinstance(value, defaultdict):
+        return f'defaultdict({value.default_factory()!r}, {_stable_repr(dict(value))})'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f'{k!r}: {_stable_repr(v)}' for k, v in sorted(value.items())) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_stable_repr(v) for v in value) + ']'
+    return repr(value)
+
+
+def _parquet_path(path_csv: Path, read_kwargs: dict) -> Path:
+    """
+    Parquet cache path for a CSV: ``<name>.<fingerprint>.parquet``.
+    
+    The fingerprint covers the read_csv arguments (dtype schema, usecols,
+    index_col, ...) and _PARQUET_CACHE_VERSION, so a schema change reads
+    the CSV again instead of serving a stale Parquet copy.
+    """
+    key = f'{_PARQUET_CACHE_VERSION}:{_stable_repr(read_kwargs)}'
+    fingerprint = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return path_csv.with_suffix(f'.{fingerprint}.parquet')
+
+
+def _write_parquet_atomic(df: pd.DataFrame, path_parquet: Path) -> None:
+    """Write to a temp file in the same directory, then os.replace() it in."""
+    fd, tmp = tempfile.mkstemp(dir=path_parquet.parent, prefix=path_parquet.name, suffix='.tmp')
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, engine='pyarrow', compression='zstd')
+        os.replace(tmp, path_parquet)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_cached(path_csv: Path, **read_kwargs) -> pd.DataFrame:
+    """
+    Read a CSV through a sibling Parquet cache.
+    
+    If the Parquet copy for these read arguments (see _parquet_path) exists
+    and is newer than the CSV it is read instead (no type inference or
+    string parsing). Otherwise, or if it cannot be read, the CSV is parsed,
+    run through _optimize_dtypes and the Parquet copy is written for the
+    next cold load. Writing is best-effort and atomic: concurrent sessions
+    never see a half-written file, and a read-only deployment simply keeps
+    using the CSV.
+    """
+    path_parquet = _parquet_path(path_csv, read_kwargs)
+    
+    if HAS_PYARROW:
+        try:
+            if path_parquet.stat().st_mtime >= path_csv.stat().st_mtime:
+                return pd.read_parquet(path_parquet, engine='pyarrow')
+        except Exception:
+            # Missing or unreadable cache: fall back to the CSV
+            pass
+    
+    df = _optimize_dtypes(pd.read_csv(path_csv, **read_kwargs))
+    
+    if HAS_PYARROW:
+        try:
+            _write_parquet_atomic(df, path_parquet)
+        except Exception:
+            pass
+    return df
+
+
+def _read_portfolio_csv(path: Path) -> pd.DataFrame:
+    """
+    Read a portfolio CSV with the known schema and normalized columns.
+    
+    Parsed frames are memoized per (path, mtime) in-process, so repeated
+    loads skip Streamlit's hashing of the DataLoader instance and any edit
+    to the file is picked up. The result is shared: do not mutate it.
+    """
+    return _parse_portfolio_csv(str(path), path.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_portfolio_csv(path_str: str, mtime_ns: int) -> pd.DataFrame:
+    """Memoized body of _read_portfolio_csv (mtime_ns only keys the cache)."""
+    df = _read_cached(
+        Path(path_str),
+        usecols=lambda col: col in PORTFOLIO_DTYPES,
+        dtype=PORTFOLIO_DTYPES,
+        engine='c',
+    )
+    # Normalize column names
+    if 'segmento' not in df.columns and 'segmento_nombre' in df.columns:
+        df['segmento'] = df['segmento_nombre']
+    return df
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_reports_dir() -> Path:
+    """
+    Locate the reports/ directory once per process.
+    
+    Streamlit re-runs the script on every interaction; caching the probe
+    avoids repeating the stat() calls for each new DataLoader.
+    """
+    # Try multiple possible paths - looking for reports/
+    # Order: Streamlit Cloud paths first, then local development paths
+    possible_paths = [
+        # Streamlit Cloud deployment paths
+        Path("/mount/src/stocks_portfolio_selector/reports"),
+        Path("/mount/src/riskmanagement2025/reports"),
+        # Working directory (useful for both local and cloud)
+        Path.cwd() / "reports",
+        # Relative to this file
+        Path(__file__).parent.parent.parent / "reports",
+        Path(__file__).parent.parent / "reports",
+        # Simple relative paths
+        Path("reports"),
+        Path("../reports"),
+    ]
+    for p in possible_paths:
+        if p.exists():
+            return p
+    # Default fallback - will show clear error if not found
+    return Path.cwd() / "reports"
+
+
+def _read_backtest_metrics_csv(path: Path) -> pd.DataFrame:
+    """Read a per-profile backtest metrics CSV (Metrica + float columns)."""
+    return _read_cached(path, dtype=_float_dtypes(Metrica='object'), engine='c')
+
+
+def _read_equity_csv(path: Path) -> pd.DataFrame:
+    """Read a per-profile equity curve CSV with its date as index."""
+    # The pipeline writes these with index=False and the date ('Fecha')
+    # as first column: read it straight into the index
+    return _read_cached(
+        path, dtype=_float_dtypes(), index_col=0, parse_dates=[0], engine='c'
+    )
+
 
 class DataLoader:
     """
     Centralized data loading with Streamlit caching.
     Loads pre-computed outputs from pipeline in reports/ directory.
+    
+    Read-only tables (portfolios, segments, summary, equity curves, prices)
+    are cached with st.cache_resource: every session gets the same object,
+    with no pickle copy per hit. Callers must not mutate them in place;
+    take a .copy() first.
     """
     
     PERFILES = ['conservador', 'moderado', 'normal', 'agresivo', 'especulativo']
@@ -22,31 +253,31 @@ class DataLoader:
         Args:
             data_path: Path to reports directory. Defaults to relative path.
         """
-        if data_path is None:
-            # Try multiple possible paths - looking for reports/
-            # Order: Streamlit Cloud paths first, then local development paths
-            possible_paths = [
-                # Streamlit Cloud deployment paths
-                Path("/mount/src/stocks_portfolio_selector/reports"),
-                Path("/mount/src/riskmanagement2025/reports"),
-                # Working directory (useful for both local and cloud)
-                Path.cwd() / "reports",
-                # Relative to this file
-                Path(__file__).parent.parent.parent / "reports",
-                Path(__file__).parent.parent / "reports",
-                # Simple relative paths
-                Path("reports"),
-                Path("../reports"),
-            ]
-            for p in possible_paths:
-                if p.exists():
-                    data_path = str(p)
-                    break
-            else:
-                # Default fallback - will show clear error if not found
-                data_path = str(Path.cwd() / "reports")
+        self.data_path = Path(data_path) if data_path is not None else _resolve_reports_dir()
+    
+    def _read_profiles(self, filename: str, reader) -> list:
+        """
+        Read one file per profile concurrently.
+        
+        The files are independent and the CSV/Parquet readers release the
+        GIL while parsing, so a cold load costs about the slowest file
+        rather than the sum of all of them.
         
-        self.data_path = Path(data_path)
+        Args:
+            filename: Pattern with a ``{perfil}`` placeholder
+            reader: Function path -> DataFrame
+            
+        Returns:
+            List of non-empty DataFrames tagged with a ``perfil`` column
+        """
+        paths = {p: self.data_path / filename.format(perfil=p) for p in self.PERFILES}
+        paths = {p: path for p, path in paths.items() if path.exists()}
+        if not paths:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            frames = list(executor.map(reader, paths.values()))
+        return [df.assign(perfil=p) for p, df in zip(paths, frames) if not df.empty]
     
     @st.cache_data(ttl=3600)
     def load_portfolio(_self, perfil: str) -> pd.DataFrame:
@@ -55,33 +286,25 @@ class DataLoader:
         if not path.exists():
             return pd.DataFrame()
         
-        df = pd.read_csv(path)
-        # Normalize column names
-        if 'segmento' not in df.columns and 'segmento_nombre' in df.columns:
-            df['segmento'] = df['segmento_nombre']
-        return df
+        # Copy: the parsed frame is shared through _read_portfolio_csv's cache
+        return _read_portfolio_csv(path).copy()
     
-    @st.cache_data(ttl=3600)
+    @st.cache_resource(ttl=3600)
     def load_portfolios(_self) -> pd.DataFrame:
         """Load all portfolios combined."""
-        all_portfolios = []
-        for perfil in _self.PERFILES:
-            df = _self.load_portfolio(perfil)
-            if not df.empty:
-                df['perfil'] = perfil
-                all_portfolios.append(df)
+        all_portfolios = _self._read_profiles("portafolio_{perfil}.csv", _read_portfolio_csv)
         
         if not all_portfolios:
             return pd.DataFrame()
-        return pd.concat(all_portfolios, ignore_index=True)
+        return pd.concat(all_portfolios, ignore_index=True, copy=False)
     
-    @st.cache_data(ttl=3600)
+    @st.cache_resource(ttl=3600)
     def load_segments(_self) -> pd.DataFrame:
         """Load segments information."""
         path = _self.data_path / "reporte_final_segmentos.csv"
         if not path.exists():
             return pd.DataFrame()
-        return pd.read_csv(path)
+        return _read_cached(path, dtype=SEGMENT_DTYPES, engine='c')
     
     @st.cache_data(ttl=3600)
     def load_backtest_metrics(_self, perfil: str) -> pd.DataFrame:
@@ -89,63 +312,44 @@ class DataLoader:
         path = _self.data_path / f"backtest_metricas_{perfil}.csv"
         if not path.exists():
             return pd.DataFrame()
-        return pd.read_csv(path)
+        return _read_backtest_metrics_csv(path)
     
-    @st.cache_data(ttl=3600)
+    @st.cache_resource(ttl=3600)
     def load_backtest_summary(_self) -> pd.DataFrame:
         """Load combined backtest metrics for all profiles."""
         # Try loading from reports/backtest_summary.csv first (has all metrics)
         path = _self.data_path / "backtest_summary.csv"
         if path.exists():
-            return pd.read_csv(path)
+            return _read_cached(path, dtype=SUMMARY_DTYPES, engine='c')
 
         # Fallback to reporte_final_metricas.csv
         path = _self.data_path / "reporte_final_metricas.csv"
         if path.exists():
-            return pd.read_csv(path)
+            return _read_cached(path, dtype=SUMMARY_DTYPES, engine='c')
 
         # Fallback: combine individual files
-        all_metrics = []
-        for perfil in _self.PERFILES:
-            df = _self.load_backtest_metrics(perfil)
-            if not df.empty:
-                df['perfil'] = perfil
-                all_metrics.append(df)
+        all_metrics = _self._read_profiles("backtest_metricas_{perfil}.csv", _read_backtest_metrics_csv)
 
         if not all_metrics:
             return pd.DataFrame()
-        return pd.concat(all_metrics, ignore_index=True)
+        return pd.concat(all_metrics, ignore_index=True, copy=False)
     
-    @st.cache_data(ttl=3600)
+    @st.cache_resource(ttl=3600)
     def load_equity_curves(_self, perfil: str = None) -> pd.DataFrame:
         """Load equity curves for a profile or all."""
         if perfil:
             path = _self.data_path / f"backtest_equity_curves_{perfil}.csv"
             if not path.exists():
                 return pd.DataFrame()
-            df = pd.read_csv(path)
-        else:
-            # Load all profiles
-            all_curves = []
-            for p in _self.PERFILES:
-                df = _self.load_equity_curves(p)
-                if not df.empty:
-                    df['perfil'] = p
-                    all_curves.append(df)
-            if not all_curves:
-                return pd.DataFrame()
-            df = pd.concat(all_curves, ignore_index=True)
+            return _read_equity_csv(path)
         
-        # Set date as index
-        date_cols = ['date', 'Date', 'fecha', 'Fecha', 'Unnamed: 0']
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col])
-                df = df.set_index(col)
-                break
-        return df
+        # Load all profiles, keeping each curve's date index
+        all_curves = _self._read_profiles("backtest_equity_curves_{perfil}.csv", _read_equity_csv)
+        if not all_curves:
+            return pd.DataFrame()
+        return pd.concat(all_curves, copy=False)
     
-    @st.cache_data(ttl=3600)
+    @st.cache_resource(ttl=3600)
     def load_prices(_self) -> pd.DataFrame:
         """Load price matrix."""
         path = _self.data_path / "prices_matrix.csv"
@@ -156,7 +360,8 @@ class DataLoader:
             else:
                 return pd.DataFrame()
         
-        df = pd.read_csv(path)
+        # First column is the date; every other column is a ticker price
+        df = _read_cached(path, dtype=_float_dtypes(), parse_dates=[0], engine='c')
         date_cols = ['date', 'Date', 'fecha', 'Fecha', 'Unnamed: 0']
         for col in date_cols:
             if col in df.columns:
@@ -165,7 +370,7 @@ class DataLoader:
                 break
         return df
     
-    @st.cache_data(ttl=3600)
+    @st.cache_resource(ttl=3600)
     def load_metadata(_self) -> Dict:
         """Load pipeline metadata."""
         return {
@@ -177,11 +382,13 @@ class DataLoader:
     
     def get_available_profiles(self) -> list:
         """Get list of profiles with available data."""
-        available = []
-        for perfil in self.PERFILES:
-            path = self.data_path / f"portafolio_{perfil}.csv"
-            if path.exists():
-                available.append(perfil)
+        # One directory listing instead of a stat() per profile
+        try:
+            with os.scandir(self.data_path) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            names = set()
+        available = [p for p in self.PERFILES if f"portafolio_{p}.csv" in names]
         return available if available else self.PERFILES
     
     def get_portfolio_for_profile(self, profile: str) -> pd.DataFrame:
@@ -3,11 +3,12 @@ Portfolio Selector Module - Logic for selecting optimal portfolios
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import List, Mapping, Optional, Tuple
+from dataclasses import dataclass, field
+from types import MappingProxyType
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InvestorProfile:
     """Configuration for each investor profile"""
     name: str
@@ -16,9 +17,15 @@ class InvestorProfile:
     risk_level: int  # 1-5
     color: str
     icon: str
-    cluster_distribution: Dict[str, float]
+    # Read-only view; left out of __hash__ since mappings are unhashable
+    cluster_distribution: Mapping[str, float] = field(hash=False)
     expected_return: Tuple[float, float]  # (min, max)
     expected_volatility: Tuple[float, float]
+    
+    def __post_init__(self):
+        object.__setattr__(
+            self, 'cluster_distribution', MappingProxyType(dict(self.cluster_distribution))
+        )
 
 
 # Profile definitions
@@ -98,12 +105,25 @@ class PortfolioSelector:
         """
         self.portfolios = portfolios_df
         self.segments = segments_df
+        
+        # Portfolios pre-grouped by lowercase profile: O(1) lookup per
+        # selection instead of a boolean scan (+ lowercase retry) per call
+        self._by_profile = {
+            perfil: grupo
+            for perfil, grupo in portfolios_df.groupby(
+                portfolios_df['perfil'].astype(str).str.lower(), sort=False
+            )
+        } if portfolios_df is not None and 'perfil' in portfolios_df.columns else {}
     
     def get_profile_config(self, profile: str) -> InvestorProfile:
         """Get configuration for a profile."""
-        return PROFILE_CONFIGS.get(profile, PROFILE_CONFIGS['moderado'])
+        return PROFILE_CONFIGS.get(profile.lower(), PROFILE_CONFIGS['moderado'])
     
-    def seleccionar_portafolio(self, perfil: str, n_activos: int = 10) -> pd.DataFrame:
+    def seleccionar_portafolio(
+        self,
+        perfil: str,
+        n_activos: int = 10
+    ) -> pd.DataFrame:
         """
         Selecciona el portafolio para un perfil de inversor.
         
@@ -118,21 +138,14 @@ class PortfolioSelector:
         if self.portfolios is None or self.portfolios.empty:
             return pd.DataFrame(columns=['ticker', 'segmento', 'peso'])
         
-        # Filtrar por perfil
-        portfolio_base = self.portfolios[self.portfolios['perfil'] == perfil].copy()
-        
-        if portfolio_base.empty:
-            # Intentar con lowercase
-            portfolio_base = self.portfolios[self.portfolios['perfil'].str.lower() == perfil.lower()].copy()
+        # Filtrar por perfil (sin distinguir mayúsculas)
+        portfolio_base = self._by_profile.get(perfil.lower())
         
-        if portfolio_base.empty:
+        if portfolio_base is None or portfolio_base.empty:
             return pd.DataFrame(columns=['ticker', 'segmento', 'peso'])
         
         # Seleccionar top N activos
-        if 'score_compuesto' in portfolio_base.columns:
-            portfolio_final = portfolio_base.nlargest(n_activos, 'score_compuesto')
-        else:
-            portfolio_final = portfolio_base.head(n_activos)
+        portfolio_final = self._top_n(portfolio_base, n_activos)
         
         # Preparar resultado con columnas esperadas
         result = pd.DataFrame({
@@ -143,6 +156,40 @@ class PortfolioSelector:
         
         return result.reset_index(drop=True)
     
+    @staticmethod
+    def _top_n(portfolio_base: pd.DataFrame, n_activos: int) -> pd.DataFrame:
+        """
+        Top N rows by score_compuesto, same result as nlargest (first N
+        rows when there is no score column).
+        
+        np.partition finds the cut-off in O(n) without sorting the whole
+        profile; only the N selected rows are sorted afterwards.
+        """
+        if 'score_compuesto' not in portfolio_base.columns:
+            return portfolio_base.head(n_activos)
+        
+        scores = portfolio_base['score_compuesto'].to_numpy(dtype=np.float64)
+        nulos = np.isnan(scores)
+        validos = np.flatnonzero(~nulos)
+        
+        if n_activos <= 0:
+            return portfolio_base.iloc[0:0]
+        if n_activos < len(validos):
+            # N-th best score via an O(n) partition; ties at the cut-off are
+            # taken in original order, as nlargest(keep='first') does
+            puntajes = scores[validos]
+            umbral = -np.partition(-puntajes, n_activos - 1)[n_activos - 1]
+            mayores = validos[puntajes > umbral]
+            empates = validos[puntajes == umbral][:n_activos - len(mayores)]
+            validos = np.sort(np.concatenate((mayores, empates)))
+        
+        # Descending score; ties keep their original order (keep='first').
+        # Like nlargest, NaN scores only fill the remaining slots.
+        orden = validos[np.argsort(-scores[validos], kind='stable')]
+        if len(orden) < n_activos:
+            orden = np.concatenate((orden, np.flatnonzero(nulos)))[:n_activos]
+        return portfolio_base.iloc[orden]
+    
     def get_available_profiles(self) -> List[str]:
         """Retorna lista de perfiles disponibles."""
         if self.portfolios is None or self.portfolios.empty:
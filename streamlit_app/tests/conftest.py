@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: make the app packages (core, components, utils)
+importable when the suite runs from the streamlit_app directory.
+"""
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
@@ -0,0 +1,103 @@
+"""
+NumPy helpers in core.calculations checked against the pandas expressions
+they replaced (resample first/last, Series.rolling mean/std, cummax).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import calculations
+from core.calculations import (
+    PortfolioCalculations,
+    _period_bounds,
+    _rolling_mean_std_loop,
+    _rolling_mean_std_numpy,
+)
+
+
+@pytest.fixture
+def fechas():
+    # Business days with a whole missing month (2021-03) and a year change
+    idx = pd.bdate_range('2020-11-02', '2022-02-28')
+    return idx[(idx.month != 3) | (idx.year != 2021)]
+
+
+@pytest.mark.parametrize('unit, rule', [('M', 'M'), ('Y', 'Y')])
+def test_period_bounds_matches_resample(fechas, unit, rule):
+    posiciones = pd.Series(np.arange(len(fechas)), index=fechas)
+    expected = posiciones.resample(rule).agg(['first', 'last']).dropna().astype(int)
+
+    periods, first, last = _period_bounds(fechas.to_numpy(), unit)
+
+    np.testing.assert_array_equal(first, expected['first'].to_numpy())
+    np.testing.assert_array_equal(last, expected['last'].to_numpy())
+    np.testing.assert_array_equal(
+        periods, expected.index.to_numpy().astype(f'datetime64[{unit}]')
+    )
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0.0005, 0.01, 400)
+    x[0] = np.nan              # first pct_change
+    x[[50, 51, 300]] = np.nan  # interior gaps
+    x[120:140] = 0.002         # constant stretch (zero variance)
+    return x
+
+
+# The NumPy fallback subtracts cumulative sums, so a zero-variance window
+# can come out as sqrt(rounding noise) ~1e-9 instead of exactly 0
+STD_ATOL = 1e-8
+
+
+def _pandas_rolling(x, window):
+    rolling = pd.Series(x).rolling(window)
+    return rolling.mean().to_numpy(), rolling.std().to_numpy()
+
+
+KERNELS = [
+    pytest.param(_rolling_mean_std_loop, id='loop'),
+    pytest.param(_rolling_mean_std_numpy, id='numpy'),
+]
+if calculations.HAS_NUMBA:
+    from numba import njit
+    KERNELS.append(pytest.param(njit(_rolling_mean_std_loop), id='numba'))
+
+
+@pytest.mark.parametrize('kernel', KERNELS)
+@pytest.mark.parametrize('window', [2, 20, 252])
+def test_rolling_mean_std_matches_pandas(returns, kernel, window):
+    mean, std = kernel(returns, window)
+    expected_mean, expected_std = _pandas_rolling(returns, window)
+
+    np.testing.assert_allclose(mean, expected_mean, rtol=1e-9, atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(std, expected_std, rtol=1e-6, atol=STD_ATOL, equal_nan=True)
+
+
+def test_rolling_mean_std_dispatch_matches_pandas(returns):
+    mean, std = calculations._rolling_mean_std(returns, 20)
+    expected_mean, expected_std = _pandas_rolling(returns, 20)
+
+    np.testing.assert_allclose(mean, expected_mean, rtol=1e-9, atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(std, expected_std, rtol=1e-6, atol=STD_ATOL, equal_nan=True)
+
+
+def test_calculate_drawdown_matches_cummax():
+    # A NaN equity value must not poison the later peaks (cummax skips it)
+    fechas = pd.bdate_range('2022-01-03', periods=8)
+    equity = pd.DataFrame({
+        'perfil': 'moderado',
+        'fecha': fechas,
+        'equity_portafolio': [100.0, 104.0, np.nan, 101.0, 104.0, 106.0, 99.0, 107.0],
+        'equity_benchmark': [100.0, 98.0, 99.0, np.nan, np.nan, 103.0, 103.0, 101.0],
+    })
+    result = PortfolioCalculations(equity, pd.DataFrame()).calculate_drawdown('moderado')
+
+    for side, suffix in (('portafolio', 'portfolio'), ('benchmark', 'benchmark')):
+        serie = equity[f'equity_{side}']
+        peak = serie.cummax()
+        np.testing.assert_allclose(result[f'peak_{suffix}'], peak, equal_nan=True)
+        np.testing.assert_allclose(
+            result[f'drawdown_{suffix}'], (serie / peak - 1) * 100, equal_nan=True
+        )
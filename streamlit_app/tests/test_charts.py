@@ -0,0 +1,39 @@
+"""
+ChartFactory.compute_drawdown must match the pandas cummax expression used
+by the chart views before it.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.charts import ChartFactory
+
+
+def _drawdown_baseline(equity: pd.Series) -> np.ndarray:
+    peak = equity.cummax()
+    return ((equity - peak) / peak * 100).to_numpy()
+
+
+def test_compute_drawdown_matches_cummax():
+    # Repeated highs (ties), NaN gaps and a leading NaN
+    equity = pd.Series([np.nan, 100.0, 105.0, 105.0, np.nan, 98.0, 105.0, 110.0, 99.0, np.nan, 111.0])
+    np.testing.assert_allclose(
+        ChartFactory.compute_drawdown(equity), _drawdown_baseline(equity), equal_nan=True
+    )
+
+
+def test_compute_drawdown_random_walk():
+    rng = np.random.default_rng(3)
+    equity = pd.Series(10000 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000))))
+    equity[rng.choice(1000, 30, replace=False)] = np.nan
+
+    result = ChartFactory.compute_drawdown(equity)
+
+    np.testing.assert_allclose(result, _drawdown_baseline(equity), rtol=1e-12, equal_nan=True)
+    assert np.nanmax(result) == 0
+
+
+def test_compute_drawdown_accepts_float32_arrays():
+    equity = np.array([1.0, 1.2, 0.9, 1.3], dtype=np.float32)
+    result = ChartFactory.compute_drawdown(equity)
+    assert result.dtype == np.float64
+    np.testing.assert_allclose(result, _drawdown_baseline(pd.Series(equity, dtype=np.float64)))
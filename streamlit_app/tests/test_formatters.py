@@ -0,0 +1,31 @@
+"""
+Vectorized Series formatters must match the scalar formatters applied
+element by element.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.formatters import Formatters
+
+
+VALUES = [0.1234, -0.05, np.nan, 0.0, 1.5, 0.0125, -0.0125, 1234567.891, 0.1234, np.nan]
+
+
+@pytest.fixture(params=['float64', 'float32'])
+def values(request):
+    return pd.Series(VALUES, index=list('abcdefghij'), dtype=request.param)
+
+
+@pytest.mark.parametrize('decimals', [0, 1, 2])
+def test_format_percentage_series_matches_scalar(values, decimals):
+    expected = values.apply(Formatters.format_percentage, decimals=decimals)
+    result = Formatters.format_percentage_series(values, decimals)
+    pd.testing.assert_series_equal(result, expected)
+
+
+@pytest.mark.parametrize('currency', ['USD', 'EUR'])
+def test_format_currency_series_matches_scalar(values, currency):
+    expected = values.apply(Formatters.format_currency, currency=currency)
+    result = Formatters.format_currency_series(values, currency)
+    pd.testing.assert_series_equal(result, expected)
@@ -0,0 +1,60 @@
+"""
+_calcular_betas must give the betas of the per-ticker loop it replaced:
+dropna().pct_change() per asset, padded pct_change() for the benchmark,
+aligned on the common dates.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.metrics_view import _calcular_betas
+
+
+@pytest.fixture
+def precios():
+    rng = np.random.default_rng(2)
+    idx = pd.bdate_range('2021-01-01', periods=300)
+    df = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 5)), axis=0)),
+        index=idx, columns=['A', 'B', 'C', 'D', 'SPY'],
+    )
+    df.iloc[5:9, 0] = np.nan     # interior gap
+    df.iloc[::17, 1] = np.nan    # scattered gaps
+    df.iloc[:40, 2] = np.nan     # late listing
+    df.iloc[15:, 3] = np.nan     # too short (< 20 returns)
+    df.iloc[100:103, 4] = np.nan  # benchmark gap
+    df.iloc[0, 4] = np.nan
+    return df
+
+
+def _beta_baseline(df_precios, ticker, benchmark='SPY'):
+    retornos = df_precios[ticker].dropna().pct_change().dropna()
+    with warnings.catch_warnings():
+        # pandas 2.1 deprecates the default fill_method='pad' used here
+        warnings.simplefilter('ignore', FutureWarning)
+        ret_benchmark = df_precios[benchmark].pct_change().dropna()
+    common_idx = retornos.index.intersection(ret_benchmark.index)
+    if len(common_idx) <= 20:
+        return 0
+    ret_a = retornos.loc[common_idx]
+    ret_b = ret_benchmark.loc[common_idx]
+    var_b = np.var(ret_b)
+    return np.cov(ret_a, ret_b)[0, 1] / var_b if var_b > 0 else 0
+
+
+def test_betas_match_per_ticker_baseline(precios):
+    tickers = ['A', 'B', 'C', 'D']
+    betas = _calcular_betas(precios, tickers)
+
+    assert list(betas) == tickers
+    for ticker in tickers:
+        assert betas[ticker] == pytest.approx(_beta_baseline(precios, ticker), rel=1e-12, abs=1e-15)
+    assert betas['D'] == 0
+
+
+def test_betas_missing_columns():
+    df = pd.DataFrame({'A': [1.0, 2.0]})
+    assert _calcular_betas(df, ['A', 'X']) == {'A': 0}
+    assert _calcular_betas(df, ['X']) == {}
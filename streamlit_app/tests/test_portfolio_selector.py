@@ -0,0 +1,51 @@
+"""
+PortfolioSelector._top_n must return the same rows, in the same order, as
+DataFrame.nlargest(n, 'score_compuesto') (keep='first').
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.portfolio_selector import PortfolioSelector
+
+
+@pytest.fixture
+def portfolio():
+    # Ties at the cut-off (0.7 x3), a tie at the top (0.9 x2) and NaN scores
+    return pd.DataFrame({
+        'ticker': list('ABCDEFGHIJ'),
+        'score_compuesto': [0.7, 0.9, np.nan, 0.7, 0.5, 0.9, 0.7, np.nan, 0.1, 0.3],
+        'peso': np.full(10, 0.1),
+    })
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 3, 4, 5, 8, 9])
+def test_top_n_matches_nlargest(portfolio, n):
+    expected = portfolio.nlargest(n, 'score_compuesto')
+    result = PortfolioSelector._top_n(portfolio, n)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize('n', [10, 12])
+def test_top_n_whole_profile_keeps_first_on_ties(portfolio, n):
+    # For n >= len(df) nlargest falls back to an unstable sort_values, so
+    # its tie order is arbitrary; _top_n keeps keep='first' order there too
+    expected = portfolio.sort_values('score_compuesto', ascending=False, kind='stable')
+    result = PortfolioSelector._top_n(portfolio, n)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_top_n_random_scores_with_ties():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 20, 500).astype(np.float64) / 10
+    scores[rng.choice(500, 40, replace=False)] = np.nan
+    df = pd.DataFrame({'ticker': np.arange(500), 'score_compuesto': scores})
+    for n in (1, 10, 37, 100):
+        pd.testing.assert_frame_equal(
+            PortfolioSelector._top_n(df, n), df.nlargest(n, 'score_compuesto')
+        )
+
+
+def test_top_n_without_score_column_is_head(portfolio):
+    df = portfolio.drop(columns='score_compuesto')
+    pd.testing.assert_frame_equal(PortfolioSelector._top_n(df, 3), df.head(3))
@@ -1,14 +1,41 @@
 """
 Charts Module - Plotly chart factory for visualizations
 """
+import functools
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 from .formatters import ColorPalette
 
+# st.plotly_chart serializes figures through plotly.io.to_json; orjson
+# encodes the numpy x/y/z arrays natively instead of element by element
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
+
+# Per-profile chart titles ('{}' is the capitalized profile name)
+_TITLE_TEMPLATES = {
+    'equity': 'Evolucion del Capital - Perfil {}',
+    'cumulative': 'Retorno Acumulado (%) - Perfil {}',
+    'drawdown': 'Drawdown - Perfil {}',
+    'heatmap': 'Retornos Mensuales (%) - Perfil {}',
+    'annual': 'Retornos Anuales (%) - Perfil {}',
+    'radar': 'Comparacion de Metricas - {}',
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _title(kind: str, profile: str) -> str:
+    """Chart title for a profile, built once per (kind, profile)."""
+    return _TITLE_TEMPLATES[kind].format(profile.capitalize())
+
 
 class ChartFactory:
     """
@@ -28,11 +55,70 @@ class ChartFactory:
     @classmethod
     def _apply_layout(cls, fig: go.Figure, title: str, **kwargs) -> go.Figure:
         """Apply default layout to figure."""
-        layout = {**cls.DEFAULT_LAYOUT, 'title': {'text': title, 'x': 0.5}}
-        layout.update(kwargs)
-        fig.update_layout(**layout)
+        # DEFAULT_LAYOUT goes in as dict1 (kwargs still override it), so no
+        # merged copy is built per chart
+        fig.update_layout(cls.DEFAULT_LAYOUT, title={'text': title, 'x': 0.5}, **kwargs)
         return fig
     
+    @classmethod
+    def _series_layout(cls, title: str, x_title: str, y_title: str) -> dict:
+        """Default layout in nested form, for _figure."""
+        return {
+            **cls.DEFAULT_LAYOUT,
+            'title': {'text': title, 'x': 0.5},
+            'xaxis': {'title': {'text': x_title}},
+            'yaxis': {'title': {'text': y_title}},
+        }
+    
+    @staticmethod
+    def compute_drawdown(equity) -> np.ndarray:
+        """
+        Drawdown (%) of an equity or price series, for create_drawdown_chart.
+        
+        The running peak is a single np.fmax.accumulate scan (NaN-skipping,
+        like Series.cummax), followed by one vectorized division.
+        
+        Args:
+            equity: Equity/price values (array or Series)
+            
+        Returns:
+            float64 array of drawdowns in percent (0 at new highs)
+        """
+        equity = np.asarray(equity, dtype=np.float64)
+        peak = np.fmax.accumulate(equity)
+        return (equity - peak) / peak * 100
+    
+    @staticmethod
+    def _x_axis(df: pd.DataFrame) -> np.ndarray:
+        """Dates of a price frame ('fecha' column or the index) as one ndarray."""
+        return df['fecha'].to_numpy() if 'fecha' in df.columns else df.index.to_numpy()
+    
+    @staticmethod
+    def _prep_y(values) -> np.ndarray:
+        """
+        Contiguous float32 copy of a y series for Plotly.
+        
+        Figures are sent as base64 typed arrays; float32 halves the payload
+        and is far finer than a pixel for the price, equity, return and
+        drawdown series charted here.
+        """
+        return np.ascontiguousarray(values, dtype=np.float32)
+    
+    @staticmethod
+    def _figure(traces: List[dict], layout: dict) -> go.Figure:
+        """
+        Build a figure from plain trace/layout dicts, skipping validation.
+        
+        Used by the time-series charts, whose traces carry thousands of
+        points: validation re-walks every property and assigning the
+        template by name deep-copies it for every chart. The dicts are
+        fixed by this module, so that work buys nothing. Layout entries
+        must be fully nested (no magic underscores like ``xaxis_title``).
+        """
+        if isinstance(layout.get('template'), str):
+            layout = {**layout, 'template': pio.templates[layout['template']]}
+        return go.Figure({'data': traces, 'layout': layout}, _validate=False)
+    
     @classmethod
     def create_pie_chart(
         cls,
@@ -97,30 +183,31 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
         default_colors = ['#1E88E5', '#43A047', '#FDD835', '#E53935', '#8E24AA']
         
+        traces = []
         for i, col in enumerate(df.columns):
             color = colors[i] if colors and i < len(colors) else default_colors[i % len(default_colors)]
-            fig.add_trace(go.Scatter(
-                x=df.index,
-                y=df[col],
-                name=col,
-                line=dict(color=color, width=2),
-                mode='lines'
-            ))
-        
-        fig.update_layout(
-            title={'text': title, 'x': 0.5} if title else None,
-            xaxis_title=x_title,
-            yaxis_title=y_title,
-            template='plotly_white',
-            hovermode='x unified',
-            margin=dict(l=50, r=20, t=50, b=50)
-        )
-        
-        return fig
+            traces.append({
+                'type': 'scatter',
+                'x': df.index,
+                'y': df[col],
+                'name': col,
+                'line': {'color': color, 'width': 2},
+                'mode': 'lines',
+            })
+        
+        layout = {
+            'xaxis': {'title': {'text': x_title}},
+            'yaxis': {'title': {'text': y_title}},
+            'template': 'plotly_white',
+            'hovermode': 'x unified',
+            'margin': {'l': 50, 'r': 20, 't': 50, 'b': 50},
+        }
+        if title:
+            layout['title'] = {'text': title, 'x': 0.5}
+        
+        return cls._figure(traces, layout)
     
     @classmethod
     def create_equity_curve(
@@ -140,37 +227,34 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
         profile_color = ColorPalette.get_profile_color(profile)
         
         # Portfolio line
-        fig.add_trace(go.Scatter(
-            x=df['fecha'],
-            y=df['equity_portafolio'],
-            name='Portafolio',
-            line=dict(color=profile_color, width=2),
-            hovertemplate='%{y:$,.0f}<extra>Portafolio</extra>'
-        ))
+        traces = [{
+            'type': 'scatter',
+            'x': df['fecha'],
+            'y': cls._prep_y(df['equity_portafolio']),
+            'name': 'Portafolio',
+            'line': {'color': profile_color, 'width': 2},
+            'hovertemplate': '%{y:$,.0f}<extra>Portafolio</extra>',
+        }]
         
         # Benchmark line
         if show_benchmark and 'equity_benchmark' in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df['fecha'],
-                y=df['equity_benchmark'],
-                name='Benchmark (SPY)',
-                line=dict(color=ColorPalette.BENCHMARK, width=2, dash='dash'),
-                hovertemplate='%{y:$,.0f}<extra>Benchmark</extra>'
-            ))
-        
-        fig = cls._apply_layout(
-            fig, 
-            f'Evolucion del Capital - Perfil {profile.capitalize()}',
-            yaxis_title='Valor del Portafolio (USD)',
-            xaxis_title='Fecha'
-        )
-        
-        return fig
+            traces.append({
+                'type': 'scatter',
+                'x': df['fecha'],
+                'y': cls._prep_y(df['equity_benchmark']),
+                'name': 'Benchmark (SPY)',
+                'line': {'color': ColorPalette.BENCHMARK, 'width': 2, 'dash': 'dash'},
+                'hovertemplate': '%{y:$,.0f}<extra>Benchmark</extra>',
+            })
+        
+        return cls._figure(traces, cls._series_layout(
+            _title('equity', profile),
+            x_title='Fecha',
+            y_title='Valor del Portafolio (USD)'
+        ))
     
     @classmethod
     def create_cumulative_returns(
@@ -188,39 +272,42 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
         profile_color = ColorPalette.get_profile_color(profile)
         
-        fig.add_trace(go.Scatter(
-            x=df['fecha'],
-            y=df['return_portfolio_pct'],
-            name='Portafolio',
-            fill='tozeroy',
-            line=dict(color=profile_color, width=2),
-            fillcolor=f'rgba{tuple(list(int(profile_color.lstrip("#")[i:i+2], 16) for i in (0, 2, 4)) + [0.2])}',
-            hovertemplate='%{y:.1f}%<extra>Portafolio</extra>'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df['fecha'],
-            y=df['return_benchmark_pct'],
-            name='Benchmark (SPY)',
-            line=dict(color=ColorPalette.BENCHMARK, width=2, dash='dash'),
-            hovertemplate='%{y:.1f}%<extra>Benchmark</extra>'
-        ))
-        
-        # Add zero line
-        fig.add_hline(y=0, line_dash="dot", line_color="gray", opacity=0.5)
-        
-        fig = cls._apply_layout(
-            fig,
-            f'Retorno Acumulado (%) - Perfil {profile.capitalize()}',
-            yaxis_title='Retorno (%)',
-            xaxis_title='Fecha'
+        traces = [
+            {
+                'type': 'scatter',
+                'x': df['fecha'],
+                'y': cls._prep_y(df['return_portfolio_pct']),
+                'name': 'Portafolio',
+                'fill': 'tozeroy',
+                'line': {'color': profile_color, 'width': 2},
+                'fillcolor': ColorPalette.get_profile_fill_rgba(profile, 0.2),
+                'hovertemplate': '%{y:.1f}%<extra>Portafolio</extra>',
+            },
+            {
+                'type': 'scatter',
+                'x': df['fecha'],
+                'y': cls._prep_y(df['return_benchmark_pct']),
+                'name': 'Benchmark (SPY)',
+                'line': {'color': ColorPalette.BENCHMARK, 'width': 2, 'dash': 'dash'},
+                'hovertemplate': '%{y:.1f}%<extra>Benchmark</extra>',
+            },
+        ]
+        
+        layout = cls._series_layout(
+            _title('cumulative', profile),
+            x_title='Fecha',
+            y_title='Retorno (%)'
         )
-        
-        return fig
+        # Zero line (what add_hline would add)
+        layout['shapes'] = [{
+            'type': 'line', 'xref': 'x domain', 'x0': 0, 'x1': 1,
+            'yref': 'y', 'y0': 0, 'y1': 0,
+            'line': {'dash': 'dot', 'color': 'gray'}, 'opacity': 0.5,
+        }]
+        
+        return cls._figure(traces, layout)
     
     @classmethod
     def create_drawdown_chart(
@@ -238,36 +325,34 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
         profile_color = ColorPalette.get_profile_color(profile)
         
-        fig.add_trace(go.Scatter(
-            x=df['fecha'],
-            y=df['drawdown_portfolio'],
-            name='Portafolio',
-            fill='tozeroy',
-            line=dict(color=profile_color, width=1),
-            fillcolor='rgba(244, 67, 54, 0.3)',
-            hovertemplate='%{y:.1f}%<extra>Portafolio DD</extra>'
+        traces = [
+            {
+                'type': 'scatter',
+                'x': df['fecha'],
+                'y': cls._prep_y(df['drawdown_portfolio']),
+                'name': 'Portafolio',
+                'fill': 'tozeroy',
+                'line': {'color': profile_color, 'width': 1},
+                'fillcolor': ColorPalette.rgba('NEGATIVE', 0.3),
+                'hovertemplate': '%{y:.1f}%<extra>Portafolio DD</extra>',
+            },
+            {
+                'type': 'scatter',
+                'x': df['fecha'],
+                'y': cls._prep_y(df['drawdown_benchmark']),
+                'name': 'Benchmark',
+                'line': {'color': ColorPalette.BENCHMARK, 'width': 1, 'dash': 'dash'},
+                'hovertemplate': '%{y:.1f}%<extra>Benchmark DD</extra>',
+            },
+        ]
+        
+        return cls._figure(traces, cls._series_layout(
+            _title('drawdown', profile),
+            x_title='Fecha',
+            y_title='Drawdown (%)'
         ))
-        
-        fig.add_trace(go.Scatter(
-            x=df['fecha'],
-            y=df['drawdown_benchmark'],
-            name='Benchmark',
-            line=dict(color=ColorPalette.BENCHMARK, width=1, dash='dash'),
-            hovertemplate='%{y:.1f}%<extra>Benchmark DD</extra>'
-        ))
-        
-        fig = cls._apply_layout(
-            fig,
-            f'Drawdown - Perfil {profile.capitalize()}',
-            yaxis_title='Drawdown (%)',
-            xaxis_title='Fecha'
-        )
-        
-        return fig
     
     @classmethod
     def create_monthly_heatmap(
@@ -294,14 +379,17 @@ class ChartFactory:
         month_names = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun',
                        'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
         
+        # Cell labels formatted for the whole grid at once ('' for NaN)
+        z = pivot.to_numpy(dtype=np.float64) * 100  # Convert to percentage
+        text = np.where(np.isnan(z), '', np.char.mod('%.1f%%', z))
+        
         fig = go.Figure(data=go.Heatmap(
-            z=pivot.values * 100,  # Convert to percentage
+            z=z,
             x=month_names[:len(pivot.columns)],
             y=pivot.index,
             colorscale='RdYlGn',
             zmid=0,
-            text=[[f'{v*100:.1f}%' if not np.isnan(v) else '' 
-                   for v in row] for row in pivot.values],
+            text=text,
             texttemplate='%{text}',
             textfont={'size': 10},
             hovertemplate='Año: %{y}<br>Mes: %{x}<br>Retorno: %{z:.1f}%<extra></extra>'
@@ -309,7 +397,7 @@ class ChartFactory:
         
         fig = cls._apply_layout(
             fig,
-            f'Retornos Mensuales (%) - Perfil {profile.capitalize()}',
+            _title('heatmap', profile),
             yaxis_title='Año',
             xaxis_title='Mes'
         )
@@ -332,29 +420,28 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
         profile_color = ColorPalette.get_profile_color(profile)
         
-        fig.add_trace(go.Bar(
-            x=df['year'],
-            y=df['return_portfolio'] * 100,
-            name='Portafolio',
-            marker_color=profile_color,
-            hovertemplate='%{y:.1f}%<extra>Portafolio</extra>'
-        ))
-        
-        fig.add_trace(go.Bar(
-            x=df['year'],
-            y=df['return_benchmark'] * 100,
-            name='Benchmark (SPY)',
-            marker_color=ColorPalette.BENCHMARK,
-            hovertemplate='%{y:.1f}%<extra>Benchmark</extra>'
-        ))
+        fig = go.Figure(data=[
+            go.Bar(
+                x=df['year'],
+                y=df['return_portfolio'] * 100,
+                name='Portafolio',
+                marker_color=profile_color,
+                hovertemplate='%{y:.1f}%<extra>Portafolio</extra>'
+            ),
+            go.Bar(
+                x=df['year'],
+                y=df['return_benchmark'] * 100,
+                name='Benchmark (SPY)',
+                marker_color=ColorPalette.BENCHMARK,
+                hovertemplate='%{y:.1f}%<extra>Benchmark</extra>'
+            ),
+        ])
         
         fig = cls._apply_layout(
             fig,
-            f'Retornos Anuales (%) - Perfil {profile.capitalize()}',
+            _title('annual', profile),
             yaxis_title='Retorno (%)',
             xaxis_title='Año',
             barmode='group'
@@ -382,13 +469,12 @@ class ChartFactory:
             grouped = portfolio_df.groupby('segmento_nombre')['peso'].sum().reset_index()
             labels = grouped['segmento_nombre']
             values = grouped['peso']
-            colors = [ColorPalette.get_segment_color(seg) for seg in labels]
+            colors = ColorPalette.get_segment_colors(labels)
             title = 'Composicion por Segmento'
         else:
             labels = portfolio_df['ticker']
             values = portfolio_df['peso']
-            colors = [ColorPalette.get_segment_color(seg) 
-                     for seg in portfolio_df['segmento_nombre']]
+            colors = ColorPalette.get_segment_colors(portfolio_df['segmento_nombre'])
             title = 'Composicion por Activo'
         
         fig = go.Figure(data=[go.Pie(
@@ -427,7 +513,8 @@ class ChartFactory:
             color='segmento_nombre',
             size='peso',
             hover_name='ticker',
-            color_discrete_map=ColorPalette.get_segment_colors_map(),
+            # Shared class-level table (read-only here), not a fresh dict per call
+            color_discrete_map=ColorPalette._SEGMENT_COLORS_MAP,
             labels={
                 'volatility_annual': 'Volatilidad Anual',
                 'return_annualized': 'Retorno Anualizado',
@@ -489,31 +576,30 @@ class ChartFactory:
         portfolio_values = list(metrics_portfolio.values())
         benchmark_values = list(metrics_benchmark.values())
         
-        fig = go.Figure()
-        
         profile_color = ColorPalette.get_profile_color(profile)
         
-        fig.add_trace(go.Scatterpolar(
-            r=portfolio_values + [portfolio_values[0]],
-            theta=categories + [categories[0]],
-            fill='toself',
-            name='Portafolio',
-            line_color=profile_color
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=benchmark_values + [benchmark_values[0]],
-            theta=categories + [categories[0]],
-            fill='toself',
-            name='Benchmark',
-            line_color=ColorPalette.BENCHMARK,
-            opacity=0.5
-        ))
+        fig = go.Figure(data=[
+            go.Scatterpolar(
+                r=portfolio_values + [portfolio_values[0]],
+                theta=categories + [categories[0]],
+                fill='toself',
+                name='Portafolio',
+                line_color=profile_color
+            ),
+            go.Scatterpolar(
+                r=benchmark_values + [benchmark_values[0]],
+                theta=categories + [categories[0]],
+                fill='toself',
+                name='Benchmark',
+                line_color=ColorPalette.BENCHMARK,
+                opacity=0.5
+            ),
+        ])
         
         fig.update_layout(
             polar=dict(radialaxis=dict(visible=True, range=[0, max(max(portfolio_values), max(benchmark_values)) * 1.1])),
             showlegend=True,
-            title={'text': f'Comparacion de Metricas - {profile.capitalize()}', 'x': 0.5}
+            title={'text': _title('radar', profile), 'x': 0.5}
         )
         
         return fig
@@ -536,45 +622,50 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        if show_volume and 'volume' in df.columns:
-            fig = make_subplots(
-                rows=2, cols=1,
-                shared_xaxes=True,
-                vertical_spacing=0.03,
-                subplot_titles=(f'{ticker} - Precio', 'Volumen'),
-                row_heights=[0.7, 0.3]
-            )
-        else:
-            fig = go.Figure()
+        # OHLC resolved once to contiguous float32 arrays (missing columns
+        # fall back to close); Plotly encodes them as typed arrays directly
+        x = cls._x_axis(df)
+        close = cls._prep_y(df['close'])
+        open_, high, low = (
+            cls._prep_y(df[col]) if col in df.columns else close
+            for col in ('open', 'high', 'low')
+        )
         
         # Candlestick
         candlestick = go.Candlestick(
-            x=df['fecha'] if 'fecha' in df.columns else df.index,
-            open=df['open'] if 'open' in df.columns else df['close'],
-            high=df['high'] if 'high' in df.columns else df['close'],
-            low=df['low'] if 'low' in df.columns else df['close'],
-            close=df['close'],
+            x=x,
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
             name=ticker,
             increasing_line_color=ColorPalette.POSITIVE,
             decreasing_line_color=ColorPalette.NEGATIVE
         )
         
         if show_volume and 'volume' in df.columns:
-            fig.add_trace(candlestick, row=1, col=1)
+            fig = make_subplots(
+                rows=2, cols=1,
+                shared_xaxes=True,
+                vertical_spacing=0.03,
+                subplot_titles=(f'{ticker} - Precio', 'Volumen'),
+                row_heights=[0.7, 0.3]
+            )
             
             # Volume bars
-            colors = [ColorPalette.POSITIVE if c >= o else ColorPalette.NEGATIVE 
-                     for c, o in zip(df['close'], df.get('open', df['close']))]
-            
-            fig.add_trace(go.Bar(
-                x=df['fecha'] if 'fecha' in df.columns else df.index,
+            colors = np.where(close >= open_, ColorPalette.POSITIVE, ColorPalette.NEGATIVE)
+            volume = go.Bar(
+                x=x,
                 y=df['volume'],
                 marker_color=colors,
                 name='Volumen',
                 showlegend=False
-            ), row=2, col=1)
+            )
+            
+            # Both traces in one batched call
+            fig.add_traces([candlestick, volume], rows=[1, 2], cols=[1, 1])
         else:
-            fig.add_trace(candlestick)
+            fig = go.Figure(data=[candlestick])
         
         fig.update_layout(
             title={'text': f'{ticker} - Grafico de Velas', 'x': 0.5},
@@ -602,34 +693,33 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
-        # Normalize to 100 at start
-        initial_price = df['close'].iloc[0]
-        df['normalized'] = (df['close'] / initial_price) * 100
-        
-        fig.add_trace(go.Scatter(
-            x=df['fecha'] if 'fecha' in df.columns else df.index,
-            y=df['normalized'],
+        # Normalize to 100 at start (local arrays: the input frames are
+        # left untouched, so cached frames can be passed in safely)
+        close = df['close'].to_numpy(dtype=np.float64)
+        normalized = close * (100.0 / close[0])
+        
+        traces = [go.Scatter(
+            x=cls._x_axis(df),
+            y=cls._prep_y(normalized),
             name=ticker,
             line=dict(color=ColorPalette.PORTFOLIO, width=2),
             hovertemplate='%{y:.1f}<extra>' + ticker + '</extra>'
-        ))
+        )]
         
         if benchmark_df is not None and not benchmark_df.empty:
-            initial_bench = benchmark_df['close'].iloc[0]
-            benchmark_df['normalized'] = (benchmark_df['close'] / initial_bench) * 100
+            close_bench = benchmark_df['close'].to_numpy(dtype=np.float64)
+            normalized_bench = close_bench * (100.0 / close_bench[0])
             
-            fig.add_trace(go.Scatter(
-                x=benchmark_df['fecha'] if 'fecha' in benchmark_df.columns else benchmark_df.index,
-                y=benchmark_df['normalized'],
+            traces.append(go.Scatter(
+                x=cls._x_axis(benchmark_df),
+                y=cls._prep_y(normalized_bench),
                 name='SPY (Benchmark)',
                 line=dict(color=ColorPalette.BENCHMARK, width=2, dash='dash'),
                 hovertemplate='%{y:.1f}<extra>Benchmark</extra>'
             ))
         
         fig = cls._apply_layout(
-            fig,
+            go.Figure(data=traces),
             f'{ticker} - Rendimiento Normalizado (Base 100)',
             yaxis_title='Valor Normalizado',
             xaxis_title='Fecha'
@@ -651,21 +741,17 @@ class ChartFactory:
         Returns:
             Plotly figure
         """
-        fig = go.Figure()
-        
-        profiles = backtest_summary['perfil'].tolist()
-        returns = backtest_summary['Return_Portfolio'].tolist()
-        
-        colors = [ColorPalette.get_profile_color(p) for p in profiles]
-        
-        fig.add_trace(go.Bar(
-            x=[p.capitalize() for p in profiles],
-            y=[r * 100 for r in returns],
-            marker_color=colors,
-            text=[f'{r*100:.1f}%' for r in returns],
+        profiles = backtest_summary['perfil']
+        returns_pct = backtest_summary['Return_Portfolio'].to_numpy(dtype=np.float64) * 100
+        
+        fig = go.Figure(data=[go.Bar(
+            x=profiles.str.capitalize().to_numpy(),
+            y=returns_pct,
+            marker_color=ColorPalette.get_profile_colors(profiles),
+            text=np.char.mod('%.1f%%', returns_pct),
             textposition='auto',
             hovertemplate='%{x}: %{y:.1f}%<extra></extra>'
-        ))
+        )])
         
         # Add benchmark line
         if 'Return_Benchmark' in backtest_summary.columns:
@@ -6,6 +6,18 @@ import numpy as np
 from typing import Any, Optional
 
 
+# Column-name fragments that select a number format in style_dataframe
+_PCT_KEYS = ('return', 'volatility', 'drawdown', 'peso', 'weight')
+_RATIO_KEYS = ('sharpe', 'sortino', 'beta', 'alpha')
+
+# ColorPalette constants that ColorPalette.rgba() can resolve
+_RGB_COLOR_NAMES = (
+    'CONSERVADOR', 'MODERADO', 'AGRESIVO', 'ESPECULATIVO', 'NORMAL',
+    'OUTLIERS', 'ALTO_RENDIMIENTO', 'MODERADO_SEG', 'CONSERVADOR_SEG', 'ESTABLE',
+    'PORTFOLIO', 'BENCHMARK', 'POSITIVE', 'NEGATIVE', 'NEUTRAL',
+)
+
+
 class Formatters:
     """
     Centralized formatting utilities for consistent display.
@@ -27,6 +39,17 @@ class Formatters:
             return "-"
         return f"{value * 100:.{decimals}f}%"
     
+    @staticmethod
+    def format_currency_series(values: pd.Series, currency: str = "USD") -> pd.Series:
+        """Format a Series as currency in one pass (same output as format_currency)."""
+        fmt = '${:,.2f}'.format if currency == "USD" else ('{:,.2f} ' + currency).format
+        return values.map(fmt).mask(values.isna(), "-")
+    
+    @staticmethod
+    def format_percentage_series(values: pd.Series, decimals: int = 2) -> pd.Series:
+        """Format a Series as percentage in one pass (same output as format_percentage)."""
+        return (values.astype(np.float64) * 100).map(f'{{:.{decimals}f}}%'.format).mask(values.isna(), "-")
+    
     @staticmethod
     def format_number(value: float, decimals: int = 2) -> str:
         """Format number with specified decimals."""
@@ -94,25 +117,17 @@ class Formatters:
         Returns:
             Styled DataFrame
         """
-        styled = df.style
+        # Percentage and ratio columns, formatted in a single Styler.format
+        # call (ratio formats win for names matching both, as before)
+        formats = {}
+        for col in df.columns:
+            name = col.lower()
+            if any(key in name for key in _RATIO_KEYS):
+                formats[col] = '{:.2f}'
+            elif any(key in name for key in _PCT_KEYS):
+                formats[col] = '{:.2%}'
         
-        # Format percentage columns
-        pct_cols = [c for c in df.columns if any(x in c.lower() for x in 
-                   ['return', 'volatility', 'drawdown', 'peso', 'weight'])]
-        
-        for col in pct_cols:
-            if col in df.columns:
-                styled = styled.format({col: '{:.2%}'})
-        
-        # Format ratio columns
-        ratio_cols = [c for c in df.columns if any(x in c.lower() for x in 
-                     ['sharpe', 'sortino', 'beta', 'alpha'])]
-        
-        for col in ratio_cols:
-            if col in df.columns:
-                styled = styled.format({col: '{:.2f}'})
-        
-        return styled
+        return df.style.format(formats)
     
     @staticmethod
     def create_metrics_summary(portfolio_df: pd.DataFrame) -> dict:
@@ -125,20 +140,20 @@ class Formatters:
         Returns:
             Dictionary of formatted summary metrics
         """
+        # All four weighted sums in one dot product; NaN counts as 0, as
+        # in the skipna sum of each product
+        weights = np.nan_to_num(portfolio_df['peso'].to_numpy(dtype=np.float64))
+        metrics = np.nan_to_num(portfolio_df[
+            ['return_annualized', 'volatility_annual', 'sharpe_ratio', 'beta']
+        ].to_numpy(dtype=np.float64))
+        ret, vol, sharpe, beta = np.dot(weights, metrics)
+        
         return {
             'Total Activos': len(portfolio_df),
-            'Retorno Esperado': Formatters.format_percentage(
-                (portfolio_df['return_annualized'] * portfolio_df['peso']).sum()
-            ),
-            'Volatilidad Esperada': Formatters.format_percentage(
-                (portfolio_df['volatility_annual'] * portfolio_df['peso']).sum()
-            ),
-            'Sharpe Ponderado': Formatters.format_sharpe(
-                (portfolio_df['sharpe_ratio'] * portfolio_df['peso']).sum()
-            ),
-            'Beta Ponderado': Formatters.format_beta(
-                (portfolio_df['beta'] * portfolio_df['peso']).sum()
-            ),
+            'Retorno Esperado': Formatters.format_percentage(ret),
+            'Volatilidad Esperada': Formatters.format_percentage(vol),
+            'Sharpe Ponderado': Formatters.format_sharpe(sharpe),
+            'Beta Ponderado': Formatters.format_beta(beta),
         }
 
 
@@ -166,37 +181,82 @@ class ColorPalette:
     NEGATIVE = '#F44336'
     NEUTRAL = '#9E9E9E'
     
+    # (r, g, b) of each name in _RGB_COLOR_NAMES; filled once right after
+    # the class body
+    _RGB = {}
+    
+    # Lookup tables, built once at import instead of on every call
+    _PROFILE_COLORS = {
+        'conservador': CONSERVADOR,
+        'moderado': MODERADO,
+        'agresivo': AGRESIVO,
+        'especulativo': ESPECULATIVO,
+        'normal': NORMAL,
+    }
+    _SEGMENT_COLORS = {
+        'outliers': OUTLIERS,
+        'alto rendimiento': ALTO_RENDIMIENTO,
+        'moderado': MODERADO_SEG,
+        'conservador': CONSERVADOR_SEG,
+        'estable': ESTABLE,
+    }
+    _SEGMENT_COLORS_MAP = {
+        'Outliers': OUTLIERS,
+        'Alto Rendimiento': ALTO_RENDIMIENTO,
+        'Moderado': MODERADO_SEG,
+        'Conservador': CONSERVADOR_SEG,
+        'Estable': ESTABLE,
+    }
+    
     @classmethod
     def get_profile_color(cls, profile: str) -> str:
         """Get color for profile."""
-        colors = {
-            'conservador': cls.CONSERVADOR,
-            'moderado': cls.MODERADO,
-            'agresivo': cls.AGRESIVO,
-            'especulativo': cls.ESPECULATIVO,
-            'normal': cls.NORMAL,
-        }
-        return colors.get(profile.lower(), cls.NEUTRAL)
+        return cls._PROFILE_COLORS.get(profile.lower(), cls.NEUTRAL)
+    
+    @classmethod
+    def get_profile_colors(cls, profiles: pd.Series) -> np.ndarray:
+        """Get colors for a whole Series of profile names in one map pass."""
+        return (
+            profiles.astype(str).str.lower()
+            .map(cls._PROFILE_COLORS)
+            .fillna(cls.NEUTRAL)
+            .to_numpy()
+        )
+    
+    @classmethod
+    def get_profile_fill_rgba(cls, profile: str, alpha: float = 0.2) -> str:
+        """Get translucent rgba() fill color for profile."""
+        name = profile.upper() if profile.lower() in cls._PROFILE_COLORS else 'NEUTRAL'
+        return cls.rgba(name, alpha)
+    
+    @classmethod
+    def rgba(cls, name: str, alpha: float) -> str:
+        """Get rgba() string for a palette constant, e.g. rgba('NEGATIVE', 0.3)."""
+        r, g, b = cls._RGB[name]
+        return f'rgba({r}, {g}, {b}, {alpha})'
     
     @classmethod
     def get_segment_color(cls, segment: str) -> str:
         """Get color for segment."""
-        colors = {
-            'outliers': cls.OUTLIERS,
-            'alto rendimiento': cls.ALTO_RENDIMIENTO,
-            'moderado': cls.MODERADO_SEG,
-            'conservador': cls.CONSERVADOR_SEG,
-            'estable': cls.ESTABLE,
-        }
-        return colors.get(segment.lower(), cls.NEUTRAL)
+        return cls._SEGMENT_COLORS.get(segment.lower(), cls.NEUTRAL)
+    
+    @classmethod
+    def get_segment_colors(cls, segments: pd.Series) -> np.ndarray:
+        """Get colors for a whole Series of segment names in one map pass."""
+        return (
+            segments.astype(str).str.lower()
+            .map(cls._SEGMENT_COLORS)
+            .fillna(cls.NEUTRAL)
+            .to_numpy()
+        )
     
     @classmethod
     def get_segment_colors_map(cls) -> dict:
         """Get full segment color mapping."""
-        return {
-            'Outliers': cls.OUTLIERS,
-            'Alto Rendimiento': cls.ALTO_RENDIMIENTO,
-            'Moderado': cls.MODERADO_SEG,
-            'Conservador': cls.CONSERVADOR_SEG,
-            'Estable': cls.ESTABLE,
-        }
+        return dict(cls._SEGMENT_COLORS_MAP)
+
+
+ColorPalette._RGB = {
+    name: tuple(int(getattr(ColorPalette, name)[i:i + 2], 16) for i in (1, 3, 5))
+    for name in _RGB_COLOR_NAMES
+}